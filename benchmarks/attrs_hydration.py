@@ -0,0 +1,71 @@
+"""
+Throughput of attrs document loading and dumping.
+
+"Dynamic" is how every document used to be handled: a hook lookup in the
+global converter each time. The others use hooks made when the class is
+registered, with and without detailed validation.
+
+Run with: python benchmarks/attrs_hydration.py
+"""
+
+import timeit
+
+import chaise.attrs
+
+
+class DynamicRegistry(chaise.attrs.AttrsRegistry):
+    TYPE_KEY = "type"
+
+    def load_doc(self, cls, blob):
+        return chaise.attrs.converter.structure(blob, cls)
+
+    def dump_doc(self, doc):
+        return chaise.attrs.converter.unstructure(doc)
+
+
+class DetailedRegistry(chaise.attrs.AttrsRegistry):
+    TYPE_KEY = "type"
+
+
+class FastRegistry(chaise.attrs.AttrsRegistry):
+    TYPE_KEY = "type"
+    converter = chaise.attrs.make_converter(detailed_validation=False)
+
+
+def define(registry):
+    @registry.document("Line")
+    class Line:
+        sku: str
+        qty: int
+        price: float
+
+    @registry.document("Order")
+    class Order:
+        customer: str
+        total: float
+        tags: list[str]
+        lines: list[Line]
+        note: str | None = None
+
+    return Order(
+        customer="Spam",
+        total=29.97,
+        tags=["a", "b", "c"],
+        lines=[Line(sku=f"SKU{i}", qty=i, price=9.99) for i in range(3)],
+    )
+
+
+def main():
+    number = 50_000
+    print(f"{'':>16} {'loads/s':>10} {'dumps/s':>10}")
+    for registry in (DynamicRegistry, DetailedRegistry, FastRegistry):
+        loader = registry()
+        doc = define(registry)
+        blob = loader.dumpj(doc)
+        loads = number / timeit.timeit(lambda: loader.loadj(dict(blob)), number=number)
+        dumps = number / timeit.timeit(lambda: loader.dumpj(doc), number=number)
+        print(f"{registry.__name__:>16} {loads:>10,.0f} {dumps:>10,.0f}")
+
+
+if __name__ == "__main__":
+    main()
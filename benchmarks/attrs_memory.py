@@ -0,0 +1,55 @@
+"""
+Memory used by a million loaded attrs documents, slotted or not.
+
+Documents go through the same loading and metadata tracking as
+:meth:`chaise.Database.get`.
+
+Run with: python benchmarks/attrs_memory.py [count]
+"""
+
+import gc
+import sys
+import tracemalloc
+
+import chaise
+import chaise.attrs
+
+
+def measure(slots: bool, count: int) -> float:
+    class Registry(chaise.attrs.AttrsRegistry):
+        TYPE_KEY = "type"
+
+    @Registry.document("Reading", slots=slots)
+    class Reading:
+        sensor: str
+        value: float
+        ok: bool
+
+    loader = Registry()
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    docs = []
+    for i in range(count):
+        blob = {"type": "Reading", "sensor": "spam", "value": 1.5, "ok": True}
+        doc = loader.loadj(blob)
+        chaise.Database._attach(doc, "readings", f"reading{i}", '"1-abc"')
+        docs.append(doc)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return (after - before) / count
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    print(f"{count:,} documents")
+    for slots in (False, True):
+        per_doc = measure(slots, count)
+        print(
+            f"slots={slots!s:<5} {per_doc:>6.0f} bytes/doc"
+            f" {per_doc * count / 2**20:>8.0f} MiB total"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Compare the JSON codecs on CouchDB-shaped payloads.
+
+Run with: python benchmarks/codecs.py
+"""
+
+import random
+import string
+import timeit
+
+from chaise.codec import JsonCodec, OrjsonCodec, UjsonCodec
+
+
+def word(rng, n=8):
+    return "".join(rng.choices(string.ascii_lowercase, k=n))
+
+
+def document(rng, i):
+    return {
+        "_id": f"order:{i:08}",
+        "_rev": f"3-{rng.getrandbits(128):032x}",
+        "type": "Order",
+        "customer": {"name": word(rng).title(), "email": f"{word(rng)}@example.com"},
+        "placed": "2024-05-01T12:34:56Z",
+        "total": round(rng.uniform(1, 500), 2),
+        "tags": [word(rng, 5) for _ in range(3)],
+        "lines": [
+            {"sku": word(rng, 6).upper(), "qty": rng.randint(1, 5), "price": 9.99}
+            for _ in range(rng.randint(1, 6))
+        ],
+    }
+
+
+def payloads():
+    rng = random.Random(1)
+    docs = [document(rng, i) for i in range(1000)]
+    return {
+        "single doc": docs[0],
+        "_bulk_docs (1000)": {"docs": docs},
+        "_all_docs (1000)": {
+            "total_rows": 1000,
+            "offset": 0,
+            "rows": [
+                {"id": d["_id"], "key": d["_id"], "value": {"rev": d["_rev"]}, "doc": d}
+                for d in docs
+            ],
+        },
+    }
+
+
+def main():
+    codecs = []
+    for kind in (JsonCodec, OrjsonCodec, UjsonCodec):
+        try:
+            codecs.append(kind())
+        except ImportError:
+            print(f"{kind.name}: not installed")
+
+    for label, payload in payloads().items():
+        data = JsonCodec().dumps(payload)
+        number = max(1, 2_000_000 // len(data))
+        print(f"\n{label} ({len(data) / 1024:.1f} KiB)")
+        print(f"{'codec':>8} {'dumps (us)':>12} {'loads (us)':>12}")
+        for codec in codecs:
+            dumps = timeit.timeit(lambda: codec.dumps(payload), number=number)
+            loads = timeit.timeit(lambda: codec.loads(data), number=number)
+            print(
+                f"{codec.name:>8} {dumps / number * 1e6:>12.1f}"
+                f" {loads / number * 1e6:>12.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
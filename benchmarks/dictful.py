@@ -0,0 +1,101 @@
+"""
+Time and peak memory of BasicLoader turning blobs into Documents and back, for
+wide (many keys) and deep (heavily nested) documents.
+
+Compares against the previous implementation, which moved every key over with
+update() and dumped with chained dict merges.
+
+Run with: python benchmarks/dictful.py
+"""
+
+import json
+import timeit
+import tracemalloc
+
+from chaise.dictful import BasicLoader, Document
+
+
+class OldLoader:
+    def loadj(self, blob: dict, _kind=Document) -> Document:
+        doc = _kind()
+        doc.id = blob.pop("_id", None)
+        doc.rev = blob.pop("_rev", None)
+        doc.deleted = blob.pop("_deleted", False)
+        doc.attachments = blob.pop("_attachments", None)
+        doc.conflicts = blob.pop("_conflicts", None)
+        doc.deleted_conflicts = blob.pop("_deleted_conflicts", None)
+        doc.local_seq = blob.pop("_local_seq", None)
+        doc.revs_info = blob.pop("_revs_info", None)
+        doc.revisions = blob.pop("_revisions", None)
+        doc.update(blob)
+        return doc
+
+    def dumpj(self, doc: Document) -> dict:
+        return (
+            doc
+            | ({"_id": doc.id} if doc.id is not None else {})
+            | ({"_rev": doc.rev} if doc.rev is not None else {})
+            | {"_deleted": doc.deleted}
+        )
+
+
+def make_small():
+    return {"_id": "spam", "_rev": "1-abc", "eggs": 1, "foo": "bar"}
+
+
+def make_wide(nkeys: int = 10_000):
+    return {"_id": "spam", "_rev": "1-abc"} | {f"field{i}": i for i in range(nkeys)}
+
+
+def make_deep(depth: int = 200, width: int = 20):
+    node = {"leaf": True}
+    for level in range(depth):
+        node = {f"k{i}": level for i in range(width)} | {"child": node}
+    return {"_id": "spam", "_rev": "1-abc", "root": node}
+
+
+def peak(func, raw: bytes) -> int:
+    """
+    Peak memory of decoding and running func, above the decoded blob.
+    """
+    tracemalloc.start()
+    blob = json.loads(raw)
+    base, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    result = func(blob)
+    del blob
+    _, top = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return top - base
+
+
+def main():
+    print(
+        f"{'doc':>6} {'impl':>5} {'loadj (us)':>12} {'dumpj (us)':>12}"
+        f" {'loadj peak (KiB)':>17} {'dumpj peak (KiB)':>17}"
+    )
+    for name, make, number in [
+        ("small", make_small, 200_000),
+        ("wide", make_wide, 500),
+        ("deep", make_deep, 20_000),
+    ]:
+        template = make()
+        raw = json.dumps(template).encode()
+        for label, loader in [("old", OldLoader()), ("new", BasicLoader())]:
+            doc = loader.loadj(dict(template))
+            load = timeit.timeit(lambda: loader.loadj(dict(template)), number=number)
+            # Copying the blob is part of the timing, so take it back out
+            load -= timeit.timeit(lambda: dict(template), number=number)
+            dump = timeit.timeit(lambda: loader.dumpj(doc), number=number)
+            load_peak = peak(loader.loadj, raw)
+            dump_peak = peak(lambda blob: loader.dumpj(loader.loadj(blob)), raw)
+            print(
+                f"{name:>6} {label:>5} {load / number * 1e6:>12.2f}"
+                f" {dump / number * 1e6:>12.2f}"
+                f" {load_peak / 1024:>17.1f} {dump_peak / 1024:>17.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
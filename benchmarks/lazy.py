@@ -0,0 +1,85 @@
+"""
+Reading a few fields of large documents, decoding everything up front versus
+lazily, and saving them back unchanged.
+
+Run with: python benchmarks/lazy.py
+"""
+
+import json
+import timeit
+import tracemalloc
+
+from chaise._lazy import LazyObject
+from chaise.codec import default_codec
+from chaise.dictful import BasicLoader, LazyLoader
+
+FIELDS = ("title", "owner", "status")
+
+
+def read_fields(doc):
+    return [doc[field] for field in FIELDS]
+
+
+def make_docs():
+    head = {"_id": "spam", "_rev": "1-abc", "title": "Spam", "owner": "eggs"}
+    tail = {"status": "ok"}
+    return {
+        "text": head | {f"blob{i}": "lorem ipsum " * 2000 for i in range(40)} | tail,
+        "numbers": head
+        | {"series": [[i * 1.5 for i in range(100)] for _ in range(500)]}
+        | tail,
+        "nested": head
+        | {
+            f"section{i}": {f"k{j}": {"v": j, "s": "abc"} for j in range(50)}
+            for i in range(40)
+        }
+        | tail,
+    }
+
+
+def main():
+    codec = default_codec()
+    eager, lazy = BasicLoader(), LazyLoader()
+
+    def load_eager(raw: bytes):
+        return eager.loadj(codec.loads(raw))
+
+    def load_lazy(raw: bytes):
+        return lazy.loadj(LazyObject(raw.decode("utf-8")))
+
+    print(f"codec: {codec.name}")
+    print(
+        f"{'doc':>8} {'KiB':>6} {'mode':>6} {'read (us)':>10} {'save (us)':>10}"
+        f" {'kept (KiB)':>11}"
+    )
+    for name, template in make_docs().items():
+        raw = json.dumps(template).encode("utf-8")
+        for mode, load, loader in [
+            ("eager", load_eager, eager),
+            ("lazy", load_lazy, lazy),
+        ]:
+            number = 50
+            read = timeit.timeit(lambda: read_fields(load(raw)), number=number)
+            doc = load(raw)
+            read_fields(doc)
+            save = timeit.timeit(
+                lambda doc=doc: codec.dumps(loader.dumpj(doc)), number=number
+            )
+
+            tracemalloc.start()
+            before, _ = tracemalloc.get_traced_memory()
+            doc = load(raw)
+            read_fields(doc)
+            after, _ = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            del doc
+
+            print(
+                f"{name:>8} {len(raw) // 1024:>6} {mode:>6}"
+                f" {read / number * 1e6:>10.0f} {save / number * 1e6:>10.0f}"
+                f" {(after - before) / 1024:>11.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
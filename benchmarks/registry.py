@@ -0,0 +1,51 @@
+"""
+Per-document overhead of DocumentRegistry type handling, as the number of
+registered types grows.
+
+Run with: python benchmarks/registry.py
+"""
+
+import timeit
+
+import chaise.dictful
+
+
+def make_registry(ntypes: int):
+    class Registry(chaise.dictful.DictRegistry):
+        TYPE_KEY = "type"
+
+    classes = []
+    for i in range(ntypes):
+        klass = type(f"Doc{i}", (chaise.dictful.Document,), {})
+        classes.append(Registry.document(f"Doc{i}")(klass))
+
+    # The oldest type gets migrated through a few versions
+    for before, after in zip(classes[:5], classes[1:6]):
+        Registry.migration(before, after)(lambda doc, after=after: after(doc))
+
+    return Registry(), classes
+
+
+def main():
+    number = 20_000
+    print(
+        f"{'types':>6} {'dumpj (us)':>12} {'loadj (us)':>12} {'loadj+migrate (us)':>20}"
+    )
+    for ntypes in (10, 50, 200, 1000):
+        registry, classes = make_registry(ntypes)
+        # The last type registered is the slowest to find with a linear scan
+        doc = classes[-1](spam="eggs")
+        blob = registry.dumpj(doc)
+        old = registry.dumpj(classes[0](spam="eggs"))
+
+        dump = timeit.timeit(lambda: registry.dumpj(doc), number=number)
+        load = timeit.timeit(lambda: registry.loadj(dict(blob)), number=number)
+        migrate = timeit.timeit(lambda: registry.loadj(dict(old)), number=number)
+        print(
+            f"{ntypes:>6} {dump / number * 1e6:>12.2f} {load / number * 1e6:>12.2f}"
+            f" {migrate / number * 1e6:>20.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,27 @@
-import json
-from typing import AsyncIterator, Literal, Callable, Protocol, TypeVar, Generic
-
+import collections
+import contextlib
+import copy
+import random
+import time
+import weakref
+from typing import (
+    AsyncIterator,
+    Literal,
+    Callable,
+    Protocol,
+    TypeVar,
+    Generic,
+    Iterable,
+)
+
+import anyio
 import httpx
 
-from . import structs
+from . import _streaming, structs
+from ._lazy import LazyObject
+from .auth import _ROOT_EXTENSION
+from .cache import CacheEntry, DocumentCache
+from .codec import JsonCodec, default_codec
 
 
 DOCT = TypeVar("DOCT")
@@ -25,6 +43,61 @@ class DocumentLoader(Protocol, Generic[DOCT]):
         Convert a document into a JSON blob.
         """
 
+    def loadj_many(self, blobs: list[dict]) -> list[DOCT]:
+        """
+        Convert many JSON blobs at once, like a page of results.
+
+        Optional. If missing, :meth:`loadj` is called for each one.
+        """
+
+    def dumpj_many(self, docs: list[DOCT]) -> list[dict]:
+        """
+        Convert many documents at once.
+
+        Optional. If missing, :meth:`dumpj` is called for each one.
+        """
+
+    def set_revision(self, doc: DOCT, docid: str, rev: str):
+        """
+        Record the ID and revision a document was just saved as.
+
+        Optional. Only needed if documents carry their own ``_id`` and
+        ``_rev``, so that they match what's saved next time.
+        """
+
+    #: Optional. If true (on the session's :attr:`~CouchSession.loader`),
+    #: :meth:`loadj` may be given a read-only mapping that only decodes values
+    #: as they're read, instead of a dict. Its ``members`` are the undecoded
+    #: values, as :class:`~chaise.codec.RawJson`.
+    lazy: bool
+
+
+def _loadj_many(loader: DocumentLoader, blobs: list[dict]) -> list:
+    try:
+        many = loader.loadj_many
+    except AttributeError:
+        return [loader.loadj(blob) for blob in blobs]
+    else:
+        return many(blobs)
+
+
+def _dumpj_many(loader: DocumentLoader, docs: list) -> list[dict]:
+    try:
+        many = loader.dumpj_many
+    except AttributeError:
+        return [loader.dumpj(doc) for doc in docs]
+    else:
+        return many(docs)
+
+
+def _set_revision(loader: DocumentLoader, doc, docid: str, rev: str):
+    try:
+        hook = loader.set_revision
+    except AttributeError:
+        pass
+    else:
+        hook(doc, docid, rev)
+
 
 class DocumentRegistry:
     """
@@ -40,9 +113,21 @@ class DocumentRegistry:
     _docclasses = {}
     _migrations = []
 
-    def __init_sublcass__(cls):
+    # Lookup tables derived from the above, rebuilt after registrations
+    _names = {}
+    _chains = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
         cls._docclasses = {}
         cls._migrations = []
+        cls._names = {}
+        cls._chains = None
+
+    @classmethod
+    def _invalidate(cls):
+        cls._names = {}
+        cls._chains = None
 
     @classmethod
     def _get_class_from_name(cls, name: str) -> type:
@@ -50,12 +135,42 @@ class DocumentRegistry:
 
     @classmethod
     def _get_name_from_class(cls, klass: type) -> str:
+        try:
+            return cls._names[klass]
+        except KeyError:
+            pass
         for name, kind in cls._docclasses.items():
             if issubclass(klass, kind):  # In case of decorator shenanigans
+                cls._names[klass] = name
                 return name
         else:
             raise ValueError(f"Couldn't find name for {klass}")
 
+    @classmethod
+    def _get_chain(cls, name: str) -> tuple[Callable, ...]:
+        """
+        The migrations to apply, in order, to a document of the given type.
+        """
+        if cls._chains is None:
+            steps = {b: (a, f) for b, a, f in cls._migrations}
+            chains = {}
+            for start in steps:
+                funcs = []
+                bname = start
+                while bname in steps:
+                    bname, func = steps[bname]
+                    funcs.append(func)
+                chains[start] = tuple(funcs)
+            cls._chains = chains
+        return cls._chains.get(name, ())
+
+    @classmethod
+    def _needs_migration(cls, blob: dict) -> bool:
+        """
+        Is the (undecoded) document of a type that has migrations?
+        """
+        return bool(cls._get_chain(blob.get(cls.TYPE_KEY)))
+
     @classmethod
     def document(cls, name: str):
         """
@@ -73,6 +188,7 @@ class DocumentRegistry:
 
         def _(klass: type):
             cls._docclasses[name] = klass
+            cls._invalidate()
             return klass
 
         return _
@@ -81,15 +197,27 @@ class DocumentRegistry:
     def migration(cls, before: type, after: type):
         """
         Define a function that'll convert between documents.
+
+        Raises:
+            ValueError: ``before`` already has a migration, or it would form a
+                loop
         """
         # Normalize to the document classes previously registered
         bname = cls._get_name_from_class(before)
         aname = cls._get_name_from_class(after)
         # Enforce linearity
-        assert not any(b == bname for b, _, _ in cls._migrations)
+        if any(b == bname for b, _, _ in cls._migrations):
+            raise ValueError(f"{bname} already has a migration")
+        steps = {b: a for b, a, _ in cls._migrations}
+        name = aname
+        while name is not None:
+            if name == bname:
+                raise ValueError(f"Migrating {bname} to {aname} would form a loop")
+            name = steps.get(name)
 
         def _(func: Callable):
             cls._migrations.append((bname, aname, func))
+            cls._invalidate()
             return func
 
         return _
@@ -111,10 +239,8 @@ class DocumentRegistry:
         raise NotImplementedError
 
     def _migrate(self, bname, doc):
-        while funcs := [f for b, _, f in self._migrations if b == bname]:
-            (func,) = funcs
+        for func in self._get_chain(bname):
             doc = func(doc)
-            bname = self._get_name_from_class(type(doc))
         return doc
 
     def loadj(self, blob):
@@ -152,6 +278,13 @@ class Deleted(Exception):
     """
 
 
+class Rejected(Exception):
+    """
+    The server refused to write the document for a reason other than a
+    conflict (eg, a validation function or permissions).
+    """
+
+
 class CouchSession:
     """
     A connection to CouchDB.
@@ -166,15 +299,96 @@ class CouchSession:
     _client: httpx.AsyncClient
     _root: httpx.URL
 
-    #: Class responsible for de/serializing data.
+    #: Class responsible for de/serializing data. One instance is shared by
+    #: everything using the session, see :meth:`get_loader`.
     loader: type[DocumentLoader]
 
-    def __init__(self, client: httpx.AsyncClient, root: httpx.URL):
+    #: If not ``None``, :meth:`Database.get` calls made within this many
+    #: seconds of each other are combined into one
+    #: :http:post:`/{db}/_bulk_get`. ``0`` combines calls made in the same tick.
+    #:
+    #: Only calls sharing this session are combined.
+    batch_window: float | None = None
+
+    #: If true, identical ``GET`` and ``HEAD`` requests that are in flight at
+    #: the same time share a single HTTP request. Each caller still decodes its
+    #: own copy of the body.
+    #:
+    #: Only calls sharing this session are combined.
+    coalesce_reads: bool = False
+
+    #: Cache of documents used by :meth:`Database.get`, if any. Normally shared
+    #: between sessions by :meth:`SessionPool.make_cache`.
+    cache: DocumentCache | None
+
+    #: How JSON is encoded and decoded. Normally shared between sessions by
+    #: :meth:`SessionPool.make_codec`.
+    codec: JsonCodec
+
+    #: How many times a request is retried (possibly on another server) if it
+    #: fails in a way that's safe to retry. That's connection failures for
+    #: any request, and other transport errors and :attr:`retry_statuses` for
+    #: idempotent ones (``GET``, ``HEAD``, and reads sent as ``POST``).
+    #:
+    #: Only sessions from a :class:`SessionPool` retry, and only as far as
+    #: its retry budget allows (see :attr:`SessionPool.retry_ratio`).
+    max_retries: int = 3
+
+    #: Seconds to wait before the first retry. Each retry waits up to twice
+    #: as long as the last one (picked at random, so clients don't retry in
+    #: lockstep), up to :attr:`retry_backoff_max`.
+    retry_backoff: float = 0.05
+
+    #: The most seconds to wait before a retry
+    retry_backoff_max: float = 2.0
+
+    #: Status codes that mean the server (rather than the request) is having
+    #: trouble
+    retry_statuses: frozenset[int] = frozenset({500, 502, 503, 504})
+
+    #: Number of migrated documents saved by :meth:`write_back`
+    written_back: int
+
+    #: Number of migrated documents :meth:`write_back` couldn't save (usually
+    #: because they changed in the meantime)
+    write_back_failures: int
+
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        root: httpx.URL,
+        *,
+        cache: DocumentCache | None = None,
+        codec: JsonCodec | None = None,
+        pool: "SessionPool | None" = None,
+    ):
         self._client = client
         self._root = root
+        self._pool = pool
+        self.cache = cache
+        self.codec = codec if codec is not None else default_codec()
+        self._batchers = {}
+        self._inflight = {}
+        self._writeback = None
+        self._loader = None
+        self.written_back = 0
+        self.write_back_failures = 0
+
+    def get_loader(self) -> DocumentLoader:
+        """
+        Get the loader to use for an operation.
 
-    @staticmethod
-    def _fix_params(params):
+        By default, one instance of :attr:`loader` is made and reused. If your
+        loader keeps state for each operation, override this to make a new one::
+
+            def get_loader(self):
+                return self.loader()
+        """
+        if self._loader is None:
+            self._loader = self.loader()
+        return self._loader
+
+    def _fix_params(self, params):
         rv = {}
         for key, value in params.items():
             if value is None:
@@ -182,14 +396,208 @@ class CouchSession:
             elif isinstance(value, str):
                 rv[key] = value
             else:
-                rv[key] = json.dumps(value)
+                rv[key] = self.codec.dumps(value).decode("utf-8")
         return rv
 
-    async def _request(self, method, *urlparts, **kwargs):
-        url = self._root.join("/".join(urlparts))
+    def _build_request(
+        self, method, urlparts, kwargs, root: httpx.URL | None = None
+    ) -> httpx.Request:
+        if root is None:
+            root = self._root
+        url = root.join("/".join(urlparts))
         if "params" in kwargs:
             kwargs["params"] = self._fix_params(kwargs["params"])
-        resp = await self._client.request(method, url, **kwargs)
+        if "json" in kwargs:
+            kwargs["content"] = self.codec.dumps(kwargs.pop("json"))
+            kwargs["headers"] = {
+                "Content-Type": "application/json",
+                **kwargs.get("headers", {}),
+            }
+        return self._client.build_request(
+            method, url, extensions={_ROOT_EXTENSION: root}, **kwargs
+        )
+
+    async def _send(self, request: httpx.Request) -> httpx.Response:
+        if self.coalesce_reads and request.method in ("GET", "HEAD"):
+            return await self._send_coalesced(request)
+        else:
+            return await self._client.send(request)
+
+    async def _request(
+        self, method, *urlparts, idempotent: bool | None = None, **kwargs
+    ):
+        """
+        Make a request, retrying on other servers if that's safe (see
+        :attr:`max_retries`).
+
+        ``idempotent`` defaults to whether the method is a read.
+        """
+        pool = self._pool
+        if pool is None:
+            resp = await self._send(self._build_request(method, urlparts, kwargs))
+            self._raise_for_status(resp, urlparts)
+            return resp
+
+        if idempotent is None:
+            idempotent = method in ("GET", "HEAD", "OPTIONS")
+        pool._retry_budget.deposit(pool.retry_ratio)
+        if not pool._server_allowed(str(self._root)):
+            await self._failover()
+
+        for attempt in range(self.max_retries + 1):
+            server = str(self._root)
+            error = None
+            try:
+                if idempotent and pool.hedge_percentile is not None:
+                    resp = await self._send_hedged(method, urlparts, kwargs)
+                else:
+                    resp = await self._send(
+                        self._build_request(method, urlparts, kwargs)
+                    )
+            except httpx.TransportError as exc:
+                # If it never connected, the request wasn't sent
+                retryable = idempotent or isinstance(
+                    exc, (httpx.ConnectError, httpx.ConnectTimeout)
+                )
+                error = exc
+            else:
+                if resp.status_code not in self.retry_statuses:
+                    # A hedge may have moved the session
+                    pool._server_succeeded(str(self._root))
+                    self._raise_for_status(resp, urlparts)
+                    return resp
+                retryable = idempotent
+
+            pool._server_failed(server)
+            if (
+                not retryable
+                or attempt == self.max_retries
+                or not pool._retry_budget.withdraw()
+            ):
+                break
+            delay = min(self.retry_backoff * 2**attempt, self.retry_backoff_max)
+            await anyio.sleep(random.uniform(delay / 2, delay))
+            await self._failover()
+
+        if error is not None:
+            raise error
+        self._raise_for_status(resp, urlparts)
+        return resp
+
+    async def _send_hedged(self, method, urlparts, kwargs) -> httpx.Response:
+        """
+        Send a read, and if it's slow, send it to another server too (see
+        :attr:`SessionPool.hedge_percentile`). Whichever answers first is used,
+        and the other is cancelled.
+        """
+        pool = self._pool
+        request = self._build_request(method, urlparts, kwargs)
+        delay = pool._hedge_after
+        if delay is None:
+            # Not enough reads yet to know what's slow
+            start = time.monotonic()
+            resp = await self._send(request)
+            if resp.status_code not in self.retry_statuses:
+                pool._read_finished(time.monotonic() - start)
+            return resp
+
+        pool.hedgeable += 1
+        pool._hedge_budget.deposit(pool.hedge_ratio)
+        primary = self._root
+        scopes = []
+        outcomes = []
+        sender, receiver = anyio.create_memory_object_stream(2)
+
+        def good(outcome) -> bool:
+            _, result = outcome
+            return (
+                isinstance(result, httpx.Response)
+                and result.status_code not in self.retry_statuses
+            )
+
+        async def attempt(root, request, scope):
+            with scope:
+                start = time.monotonic()
+                try:
+                    if root is primary:
+                        result = await self._send(request)
+                    else:
+                        result = await self._client.send(request)
+                except Exception as exc:
+                    result = exc
+                if good((root, result)):
+                    pool._read_finished(time.monotonic() - start)
+                sender.send_nowait((root, result))
+
+        with sender, receiver:
+            async with anyio.create_task_group() as tg:
+                scopes.append(anyio.CancelScope())
+                tg.start_soon(attempt, primary, request, scopes[0])
+                with anyio.move_on_after(delay):
+                    outcomes.append(await receiver.receive())
+                if not outcomes and pool._hedge_budget.withdraw():
+                    hedge = await pool._failover_server(str(primary))
+                    # Finding a server can take a while (eg, DNS), and the
+                    # original might have answered in the meantime
+                    try:
+                        outcomes.append(receiver.receive_nowait())
+                    except anyio.WouldBlock:
+                        pass
+                    if hedge is None or outcomes:
+                        pool._hedge_budget.deposit(1)
+                    else:
+                        pool.hedged += 1
+                        scopes.append(anyio.CancelScope())
+                        tg.start_soon(
+                            attempt,
+                            hedge,
+                            self._build_request(method, urlparts, kwargs, root=hedge),
+                            scopes[1],
+                        )
+                while len(outcomes) < len(scopes) and not any(map(good, outcomes)):
+                    outcomes.append(await receiver.receive())
+                for scope in scopes:
+                    scope.cancel()
+
+        # The first good answer, or if there isn't one, the original's
+        for root, result in filter(good, outcomes):
+            break
+        else:
+            root, result = next(o for o in outcomes if o[0] is primary)
+        if root is not primary:
+            pool.hedge_wins += 1
+            if any(o[0] is primary for o in outcomes):
+                pool._server_failed(str(primary))
+            self._root = root
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    async def _failover(self):
+        """
+        Move to another server, if there's a better one.
+        """
+        url = await self._pool._failover_server(str(self._root))
+        if url is not None:
+            self._root = url
+
+    @contextlib.asynccontextmanager
+    async def _stream(self, method, *urlparts, **kwargs):
+        """
+        Like :meth:`_request`, but the body is not read ahead of time.
+        """
+        request = self._build_request(method, urlparts, kwargs)
+        resp = await self._client.send(request, stream=True)
+        try:
+            if not resp.is_success:
+                await resp.aread()
+            self._raise_for_status(resp, urlparts)
+            yield resp
+        finally:
+            await resp.aclose()
+
+    @staticmethod
+    def _raise_for_status(resp: httpx.Response, urlparts):
         try:
             resp.raise_for_status()
         except httpx.HTTPStatusError as exc:
@@ -201,7 +609,35 @@ class CouchSession:
                     raise Conflict(f"Conflict updating {'/'.join(urlparts)}") from exc
                 case _:
                     raise
-        return resp
+
+    async def _send_coalesced(self, request: httpx.Request) -> httpx.Response:
+        """
+        Send a request, piggybacking on an identical one if it's in flight.
+        """
+        key = request.method, str(request.url), tuple(request.headers.multi_items())
+        if (flight := self._inflight.get(key)) is not None:
+            await flight["done"].wait()
+            if flight["resp"] is not None:
+                return flight["resp"]
+            elif flight["exc"] is not None:
+                raise flight["exc"]
+            # The original caller was cancelled, so do it ourselves
+            return await self._client.send(request)
+
+        flight = self._inflight[key] = {
+            "done": anyio.Event(),
+            "resp": None,
+            "exc": None,
+        }
+        try:
+            flight["resp"] = await self._client.send(request)
+        except Exception as exc:
+            flight["exc"] = exc
+            raise
+        finally:
+            del self._inflight[key]
+            flight["done"].set()
+        return flight["resp"]
 
     def __getitem__(self, key: str) -> "Database":
         """
@@ -265,13 +701,229 @@ class CouchSession:
 
         See :http:get:`/_all_dbs`
         """
-        resp = await self._request("GET", "_all_dbs")
-        for dbname in resp.json():
-            yield dbname
+        async with self._stream("GET", "_all_dbs") as resp:
+            async for dbname in _streaming.iter_rows(resp.aiter_text(), key=None):
+                yield dbname
+
+    async def write_back(
+        self,
+        *,
+        window: float = 1.0,
+        max_docs: int = 100,
+        task_status=anyio.TASK_STATUS_IGNORED,
+    ):
+        """
+        Save documents that were migrated when they were read, so that they
+        don't have to be migrated again.
+
+        Runs forever. While it's running, documents loaded through this session
+        that went through a migration are queued, and saved in batches every
+        ``window`` seconds. Saves use the revision that was read, so documents
+        that changed in the meantime are left alone. Documents that are saved
+        have their revision updated, like with :meth:`Database.bulk_put`.
+
+        Start it in a task group, like::
+
+            await tg.start(session.write_back)
+
+        Only works if :attr:`loader` is a :class:`DocumentRegistry`.
+        """
+        if self._writeback is not None:
+            raise RuntimeError("write_back() is already running")
+        queue = self._writeback = _WriteBack()
+        try:
+            task_status.started()
+            while True:
+                await queue.ready.wait()
+                await anyio.sleep(window)
+                pending = queue.take()
+                for db, items in pending.values():
+                    try:
+                        results = await db._bulk_docs(
+                            items.values(),
+                            max_docs=max_docs,
+                            max_bytes=4 * 1024 * 1024,
+                        )
+                    except httpx.HTTPError:
+                        # They'll be queued again next time they're read
+                        self.write_back_failures += len(items)
+                        continue
+                    for res in results:
+                        if res.ok:
+                            self.written_back += 1
+                        else:
+                            self.write_back_failures += 1
+        finally:
+            self._writeback = None
 
     # TODO: Database metadata
 
 
+class _GetBatcher:
+    """
+    Combines concurrent :meth:`Database.get` calls into :meth:`Database._bulk_get`.
+
+    The first caller of a batch waits out the window and then does the request
+    on behalf of everyone else.
+    """
+
+    class _Batch:
+        def __init__(self):
+            #: (docid, rev) -> number of callers
+            self.keys = {}
+            #: (docid, rev) -> list of DocResult, one per caller
+            self.results = None
+            self.done = anyio.Event()
+
+    def __init__(self, db: "Database", window: float):
+        self._db = db
+        self._window = window
+        self._batch = None
+
+    async def get(self, docid: str, rev: str | None):
+        key = docid, rev
+        batch = self._batch
+        if batch is None:
+            batch = self._batch = self._Batch()
+            batch.keys[key] = 1
+            try:
+                await anyio.sleep(self._window)
+                self._batch = None
+                await self._dispatch(batch)
+            finally:
+                if self._batch is batch:
+                    self._batch = None
+                batch.done.set()
+        else:
+            batch.keys[key] = batch.keys.get(key, 0) + 1
+            await batch.done.wait()
+            if batch.results is None:
+                # The request failed, so give the caller its own error
+                return await self._db._get(docid, rev=rev)
+
+        return batch.results[key].pop().unwrap()
+
+    async def _dispatch(self, batch):
+        keys = [
+            {"id": docid} if rev is None else {"id": docid, "rev": rev}
+            for docid, rev in batch.keys
+        ]
+        raw = await self._db._bulk_get(keys, max_docs=1000, concurrency=4)
+        results = {}
+        for key, res, count in zip(keys, raw, batch.keys.values()):
+            # Every caller gets their own copy of the document
+            copies = [copy.deepcopy(res) for _ in range(count - 1)]
+            results[key["id"], key.get("rev")] = self._db._bulk_get_results(
+                [key] * count, [res, *copies]
+            )
+        batch.results = results
+
+
+class _Breaker:
+    """
+    Circuit breaker for a server: after enough failures in a row, it's avoided
+    for a while.
+    """
+
+    __slots__ = ("failures", "opened")
+
+    def __init__(self):
+        self.failures = 0
+        self.opened = None
+
+    def allows(self, cooldown: float) -> bool:
+        # Once the cooldown is over, requests can try it again. A failure then
+        # opens it straight back up.
+        return self.opened is None or time.monotonic() - self.opened >= cooldown
+
+    def failed(self, threshold: int):
+        self.failures += 1
+        if self.failures >= threshold:
+            self.opened = time.monotonic()
+
+    def succeeded(self):
+        self.failures = 0
+        self.opened = None
+
+
+class _RetryBudget:
+    """
+    Token bucket limiting retries (or hedges) to a fraction of requests, so
+    that they can't multiply the load on a struggling cluster.
+    """
+
+    __slots__ = ("tokens", "reserve")
+
+    def __init__(self, reserve: float):
+        self.reserve = reserve
+        self.tokens = reserve
+
+    def deposit(self, amount: float):
+        self.tokens = min(self.tokens + amount, self.reserve)
+
+    def withdraw(self) -> bool:
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+
+class _WriteBack:
+    """
+    Documents waiting for :meth:`CouchSession.write_back`.
+    """
+
+    def __init__(self):
+        #: db name -> (Database, {docid: (doc, blob)})
+        self.pending = {}
+        self.ready = anyio.Event()
+
+    def add(self, db: "Database", docid: str, doc, blob: dict):
+        _, items = self.pending.setdefault(db._name, (db, {}))
+        items[docid] = doc, blob
+        self.ready.set()
+
+    def take(self) -> dict:
+        pending, self.pending = self.pending, {}
+        self.ready = anyio.Event()
+        return pending
+
+
+#: Where :class:`Database` keeps the metadata of documents. Classes without a
+#: ``__dict__`` (eg, slotted ones) should include these in their ``__slots__``,
+#: or the metadata has to be tracked on the side, which uses more memory.
+METADATA_SLOTS = ("_Database__db", "_Database__docid", "_Database__etag")
+
+
+class _DocRef(weakref.ref):
+    """
+    Metadata for a document that can't hold it itself (see
+    :data:`METADATA_SLOTS`). Only lives as long as the document.
+    """
+
+    __slots__ = ("key", "db", "docid", "etag")
+
+    #: id(doc) -> _DocRef
+    table = {}
+
+    def __new__(cls, doc, db, docid, etag):
+        return super().__new__(cls, doc, cls._forget)
+
+    def __init__(self, doc, db, docid, etag):
+        super().__init__(doc, self._forget)
+        self.key = id(doc)
+        self.db = db
+        self.docid = docid
+        self.etag = etag
+        self.table[self.key] = self
+
+    @staticmethod
+    def _forget(ref):
+        # Only if it hasn't been replaced by a newer one
+        if _DocRef.table.get(ref.key) is ref:
+            del _DocRef.table[ref.key]
+
+
 class Database:
     """
     An individual database.
@@ -284,27 +936,81 @@ class Database:
         self._session = session
         self._name = name
 
+    def _loads(self, content: bytes):
+        """
+        Decode a document body, lazily if the loader can take it.
+        """
+        if getattr(self._session.loader, "lazy", False):
+            return LazyObject(content.decode("utf-8"))
+        return self._session.codec.loads(content)
+
     def _blob2doc(self, blob, db, docid, etag=...):
-        if docid is ...:
-            docid = blob["_id"]
-        if etag is ...:
-            etag = f'"{blob["_rev"]}"'
-        doc = self._session.loader().loadj(blob)
-        doc.__db = db
-        doc.__docid = docid
-        doc.__etag = etag
+        (doc,) = self._blobs2docs([(blob, docid, etag)], db)
         return doc
 
-    def _doc2blob(self, doc):
-        blob = self._session.loader().dumpj(doc)
-        db = docid = etag = None
+    def _blobs2docs(self, items, db) -> list:
+        """
+        Load a batch of (blob, docid, etag). Like with :meth:`_blob2doc`, the
+        docid and etag can be ``...`` to take them from the blob.
+        """
+        loader = self._session.get_loader()
+        queue = self._session._writeback
+        if not isinstance(loader, DocumentRegistry):
+            queue = None
+        blobs, metas = [], []
+        for blob, docid, etag in items:
+            if docid is ...:
+                docid = blob["_id"]
+            if etag is ...:
+                etag = f'"{blob["_rev"]}"'
+            extra = None
+            if (
+                queue is not None
+                and not blob.get("_deleted", False)
+                and loader._needs_migration(blob)
+            ):
+                # Not every kind of document keeps its metadata (attrs ones
+                # don't), so take it from the blob for saving the migration
+                extra = {
+                    key: blob[key]
+                    for key in ("_id", "_rev", "_attachments")
+                    if key in blob
+                }
+            blobs.append(blob)
+            metas.append((docid, etag, extra))
+        docs = _loadj_many(loader, blobs)
+        for doc, (docid, etag, extra) in zip(docs, metas):
+            if extra is not None:
+                queue.add(self, docid, doc, loader.dumpj(doc) | extra)
+            self._attach(doc, db, docid, etag)
+        return docs
+
+    @staticmethod
+    def _attach(doc, db, docid, etag):
         try:
-            db = doc.__db
-            docid = doc.__docid
-            etag = doc.__etag
+            doc.__db = db
+            doc.__docid = docid
+            doc.__etag = etag
         except AttributeError:
-            pass
-        return blob, db, docid, etag
+            # No __dict__ (eg, slots), so keep it on the side
+            _DocRef(doc, db, docid, etag)
+
+    @staticmethod
+    def _metadata(doc):
+        """
+        The (db, docid, etag) attached to a document, if any.
+        """
+        try:
+            return doc.__db, doc.__docid, doc.__etag
+        except AttributeError:
+            ref = _DocRef.table.get(id(doc))
+            if ref is not None and ref() is doc:
+                return ref.db, ref.docid, ref.etag
+            return None, None, None
+
+    def _doc2blob(self, doc):
+        blob = self._session.get_loader().dumpj(doc)
+        return blob, *self._metadata(doc)
 
     async def get(
         self,
@@ -324,8 +1030,63 @@ class Database:
         """
         Get a document
 
+        Simple gets (no options besides ``rev``) may be served by the session's
+        :attr:`~CouchSession.cache`, or if there isn't one, batched with other
+        concurrent calls (see :attr:`~CouchSession.batch_window`).
+
         See :http:get:`/{db}/{docid}`
         """
+        simple = not (
+            attachments
+            or conflicts
+            or deleted_conflicts
+            or latest
+            or local_seq
+            or meta
+            or open_revs
+            or revs
+            or revs_info
+        )
+        if simple and self._session.cache is not None:
+            return await self._get_cached(docid, rev)
+        elif simple and self._session.batch_window is not None:
+            try:
+                batcher = self._session._batchers[self._name]
+            except KeyError:
+                batcher = self._session._batchers[self._name] = _GetBatcher(
+                    self, self._session.batch_window
+                )
+            return await batcher.get(docid, rev)
+
+        return await self._get(
+            docid,
+            attachments=attachments,
+            conflicts=conflicts,
+            deleted_conflicts=deleted_conflicts,
+            latest=latest,
+            local_seq=local_seq,
+            meta=meta,
+            open_revs=open_revs,
+            rev=rev,
+            revs=revs,
+            revs_info=revs_info,
+        )
+
+    async def _get(
+        self,
+        docid: str,
+        *,
+        attachments: bool = False,
+        conflicts: bool = False,
+        deleted_conflicts: bool = False,
+        latest: bool = False,
+        local_seq: bool = False,
+        meta: bool = False,
+        open_revs: list[str] | Literal["all"] | None = None,
+        rev: str | None = None,
+        revs: bool = False,
+        revs_info: bool = False,
+    ):
         resp = await self._session._request(
             "GET",
             self._name,
@@ -347,7 +1108,7 @@ class Database:
             },
         )
 
-        blob = resp.json()
+        blob = self._loads(resp.content)
         if blob.get("_deleted", False):  # TODO: Flag to override this
             raise Deleted("Document {self._name}/{docid} is marked as deleted")
         if "ETag" in resp.headers:
@@ -358,6 +1119,157 @@ class Database:
         doc = self._blob2doc(blob, self._name, docid, etag)
         return doc
 
+    async def _get_cached(self, docid: str, rev: str | None):
+        """
+        :meth:`get`, but using the cache.
+        """
+        cache = self._session.cache
+        entry = cache.get(self._name, docid, rev)
+        if entry is not None and (
+            # docid + revision is immutable(ish), so don't even ask
+            rev is not None or cache.is_current(self._name, docid, entry)
+        ):
+            cache.hits += 1
+            return self._blob2doc(self._loads(entry.raw), self._name, docid, entry.etag)
+
+        stamp = cache.stamp(self._name)
+
+        try:
+            resp = await self._session._request(
+                "GET",
+                self._name,
+                docid,
+                params={"rev": rev},
+                headers={
+                    "Accept": "application/json",
+                    **({"If-None-Match": entry.etag} if entry is not None else {}),
+                },
+            )
+        except Missing:
+            cache.evict(self._name, docid)
+            raise
+        except httpx.HTTPStatusError as exc:
+            if exc.response.status_code != 304:
+                raise
+            entry.stamp = stamp
+            cache.hits += 1
+            return self._blob2doc(self._loads(entry.raw), self._name, docid, entry.etag)
+
+        cache.misses += 1
+        blob = self._loads(resp.content)
+        if blob.get("_deleted", False):
+            cache.evict(self._name, docid)
+            raise Deleted(f"Document {self._name}/{docid} is marked as deleted")
+        etag = resp.headers.get("ETag", f'"{blob["_rev"]}"')
+        cache.put(
+            self._name,
+            docid,
+            CacheEntry(rev=blob["_rev"], etag=etag, raw=resp.content, stamp=stamp),
+            pinned=rev is not None,
+        )
+        return self._blob2doc(blob, self._name, docid, etag)
+
+    async def get_many(
+        self,
+        docids: Iterable[str | tuple[str, str]],
+        *,
+        max_docs: int = 100,
+        concurrency: int = 4,
+    ) -> list[structs.DocResult]:
+        """
+        Get many documents at once.
+
+        Each item is either a document ID or a ``(docid, rev)`` pair.
+
+        Requests are split so that each one has at most ``max_docs`` documents,
+        and up to ``concurrency`` of them are in flight at once.
+
+        Does not raise for missing or deleted documents. Instead, the results
+        (in the same order as the request) carry :class:`Missing` or
+        :class:`Deleted`.
+
+        See :http:post:`/{db}/_bulk_get`
+        """
+        keys = [
+            {"id": key[0], "rev": key[1]} if isinstance(key, tuple) else {"id": key}
+            for key in docids
+        ]
+        raw = await self._bulk_get(keys, max_docs, concurrency)
+        return self._bulk_get_results(keys, raw)
+
+    async def _bulk_get(self, keys, max_docs: int, concurrency: int) -> list[dict]:
+        """
+        Does the requests for :meth:`get_many`, returning the raw results.
+        """
+        results = [None] * len(keys)
+        limiter = anyio.CapacityLimiter(concurrency)
+
+        async def fetch(start):
+            chunk = keys[start : start + max_docs]
+            async with limiter:
+                resp = await self._session._request(
+                    "POST",
+                    self._name,
+                    "_bulk_get",
+                    json={"docs": chunk},
+                    headers={
+                        "Accept": "application/json",
+                    },
+                    idempotent=True,
+                )
+            # Results are in the same order as the request
+            results[start : start + len(chunk)] = self._session.codec.loads(
+                resp.content
+            )["results"]
+
+        async with anyio.create_task_group() as tg:
+            for start in range(0, len(keys), max_docs):
+                tg.start_soon(fetch, start)
+
+        return results
+
+    def _bulk_get_results(self, keys, raw) -> list[structs.DocResult]:
+        """
+        Turn raw :meth:`_bulk_get` results into :class:`DocResult`, loading all
+        the documents in one go.
+        """
+        results, loading = [], []
+        for key, res in zip(keys, raw):
+            docid = key["id"]
+            match res["docs"]:
+                case [{"ok": {"_deleted": True, "_rev": rev}}, *_]:
+                    result = structs.DocResult(
+                        docid=docid,
+                        rev=rev,
+                        error=Deleted(
+                            f"Document {self._name}/{docid} is marked as deleted"
+                        ),
+                    )
+                case [{"ok": blob}, *_]:
+                    result = structs.DocResult(docid=docid, rev=blob["_rev"])
+                    loading.append((result, blob))
+                case [{"error": {"error": error, "reason": reason}}, *_]:
+                    result = structs.DocResult(
+                        docid=docid,
+                        rev=key.get("rev"),
+                        error=Missing(
+                            f"Could not find {self._name}/{docid}: {error}: {reason}"
+                        ),
+                    )
+                case _:
+                    result = structs.DocResult(
+                        docid=docid,
+                        rev=key.get("rev"),
+                        error=Missing(f"Could not find {self._name}/{docid}"),
+                    )
+            results.append(result)
+        docs = self._blobs2docs(
+            [(blob, result.docid, ...) for result, blob in loading], self._name
+        )
+        for (result, _), doc in zip(loading, docs):
+            result.doc = doc
+        return results
+
     # TODO: Attachments
 
     async def attempt_put(
@@ -376,14 +1288,17 @@ class Database:
         """
         blob, _db, _docid, etag = self._doc2blob(doc)
         assert _db is None or _db == self._name
-        await self._session._request(
-            "PUT",
-            self._name,
-            _docid or docid,
-            params={"batch": "ok"} if batch else {},
-            headers={"If-Match": etag} if etag else {},
-            json=blob,
-        )
+        try:
+            await self._session._request(
+                "PUT",
+                self._name,
+                _docid or docid,
+                params={"batch": "ok"} if batch else {},
+                headers={"If-Match": etag} if etag else {},
+                json=blob,
+            )
+        finally:
+            self._written(_docid or docid)
 
     async def attempt_delete(self, doc, *, batch: bool = False):
         """
@@ -394,13 +1309,156 @@ class Database:
         _, db, docid, etag = self._doc2blob(doc)
         assert db == self._name
         assert docid
-        await self._session._request(
-            "DELETE",
-            db,
-            docid,
-            params={"batch": "ok"} if batch else {},
-            headers={"If-Match": etag},
-        )
+        try:
+            await self._session._request(
+                "DELETE",
+                db,
+                docid,
+                params={"batch": "ok"} if batch else {},
+                headers={"If-Match": etag},
+            )
+        finally:
+            self._written(docid)
+
+    def _written(self, docid: str):
+        """
+        Keep the cache from serving what a write might have replaced.
+        """
+        if docid is not None and self._session.cache is not None:
+            self._session.cache.written(self._name, docid)
+
+    async def _bulk_docs(self, items, max_docs: int, max_bytes: int):
+        """
+        Does the actual work of :meth:`bulk_put` and :meth:`bulk_delete`.
+
+        Takes a list of (doc, blob) and chunks them into requests.
+        """
+
+        def chunks():
+            chunk, size = [], 0
+            for doc, blob in items:
+                data = self._session.codec.dumps(blob)
+                if chunk and (len(chunk) >= max_docs or size + len(data) > max_bytes):
+                    yield chunk
+                    chunk, size = [], 0
+                chunk.append((doc, blob, data))
+                size += len(data) + 1
+            if chunk:
+                yield chunk
+
+        loader = self._session.get_loader()
+        results = []
+        for chunk in chunks():
+            body = b'{"docs":[' + b",".join(data for *_, data in chunk) + b"]}"
+            try:
+                resp = await self._session._request(
+                    "POST",
+                    self._name,
+                    "_bulk_docs",
+                    content=body,
+                    headers={
+                        "Accept": "application/json",
+                        "Content-Type": "application/json",
+                    },
+                )
+            except BaseException:
+                # Some of them might have been written anyway
+                for _, blob, _ in chunk:
+                    self._written(blob.get("_id"))
+                raise
+            # Results are in the same order as the request
+            for (doc, blob, _), res in zip(
+                chunk, self._session.codec.loads(resp.content)
+            ):
+                docid = res.get("id", blob.get("_id"))
+                self._written(docid)
+                match res:
+                    case {"error": "conflict", "reason": reason}:
+                        error = Conflict(
+                            f"Conflict updating {self._name}/{docid}: {reason}"
+                        )
+                    case {"error": error, "reason": reason}:
+                        error = Rejected(
+                            f"Could not update {self._name}/{docid}: {error}: {reason}"
+                        )
+                    case _:
+                        error = None
+                        if doc is not None:
+                            self._attach(doc, self._name, docid, f'"{res["rev"]}"')
+                            _set_revision(loader, doc, docid, res["rev"])
+                results.append(
+                    structs.DocResult(
+                        docid=docid, rev=res.get("rev"), doc=doc, error=error
+                    )
+                )
+        return results
+
+    async def bulk_put(
+        self,
+        docs: Iterable,
+        *,
+        max_docs: int = 1000,
+        max_bytes: int = 4 * 1024 * 1024,
+    ) -> list[structs.DocResult]:
+        """
+        Create or update many documents at once.
+
+        Each item is either a document or a ``(docid, doc)`` pair (for new
+        documents). New documents without an ID get one assigned by CouchDB.
+
+        Requests are split so that each one has at most ``max_docs`` documents
+        and (roughly) ``max_bytes`` of body.
+
+        Unlike :meth:`attempt_put`, this does not raise on conflicts. Check the
+        results instead. Successfully written documents have their revision
+        updated.
+
+        See :http:post:`/{db}/_bulk_docs`
+        """
+        docids, objs = [], []
+        for item in docs:
+            if isinstance(item, tuple):
+                docid, doc = item
+            else:
+                docid, doc = None, item
+            docids.append(docid)
+            objs.append(doc)
+        blobs = _dumpj_many(self._session.get_loader(), objs)
+        items = []
+        for docid, doc, blob in zip(docids, objs, blobs):
+            _db, _docid, etag = self._metadata(doc)
+            assert _db is None or _db == self._name
+            if _docid or docid:
+                blob["_id"] = _docid or docid
+            if etag:
+                blob["_rev"] = etag.strip('"')
+            items.append((doc, blob))
+        return await self._bulk_docs(items, max_docs, max_bytes)
+
+    async def bulk_delete(
+        self,
+        docs: Iterable,
+        *,
+        max_docs: int = 1000,
+        max_bytes: int = 4 * 1024 * 1024,
+    ) -> list[structs.DocResult]:
+        """
+        Delete many documents at once.
+
+        Like :meth:`bulk_put`, this reports conflicts in the results instead of
+        raising.
+
+        See :http:post:`/{db}/_bulk_docs`
+        """
+        items = []
+        for doc in docs:
+            db, docid, etag = self._metadata(doc)
+            assert db == self._name
+            assert docid
+            items.append(
+                (doc, {"_id": docid, "_rev": etag.strip('"'), "_deleted": True})
+            )
+        return await self._bulk_docs(items, max_docs, max_bytes)
 
     async def attempt_copy(self, src_doc, dst_doc, *, batch: bool = False):
         """
@@ -433,33 +1491,162 @@ class Database:
             else:
                 break
 
+    async def _iter_rows(
+        self,
+        *urlparts,
+        params: dict,
+        keys: list | None = None,
+        page_size: int | None = None,
+        limit: int | None = None,
+        lazy: bool = False,
+    ) -> AsyncIterator[dict]:
+        """
+        Produce the raw rows of a view-like endpoint.
+
+        If ``page_size`` is given, makes several requests, using
+        ``startkey``/``startkey_docid`` to pick up where the last page left off
+        (or chunks of ``keys``).
+
+        If ``lazy``, rows (and the objects in them) are
+        :class:`~chaise._lazy.LazyObject`, see :attr:`DocumentLoader.lazy`.
+        """
+        # Keys are JSON, even if they're strings
+        params = {
+            name: self._session.codec.dumps(value).decode("utf-8")
+            if name in ("key", "startkey", "endkey") and value is not None
+            else value
+            for name, value in params.items()
+        }
+        headers = {"Accept": "application/json"}
+        # Index the objects in the rows (like the doc) along with the rows
+        depth = 2 if lazy else 0
+
+        if keys is not None:
+            step = page_size or len(keys) or 1
+            for start in range(0, len(keys), step):
+                if limit is not None and limit <= 0:
+                    return
+                # The limit is for all the chunks together
+                async with (
+                    self._session._stream(
+                        "POST",
+                        self._name,
+                        *urlparts,
+                        params={**params, "limit": limit},
+                        json={"keys": keys[start : start + step]},
+                        headers=headers,
+                    ) as resp,
+                    contextlib.aclosing(
+                        _streaming.iter_rows(resp.aiter_text(), lazy=depth)
+                    ) as rows,
+                ):
+                    async for row in rows:
+                        if limit is not None:
+                            if limit <= 0:
+                                break
+                            limit -= 1
+                        yield row
+            return
+
+        if page_size is None:
+            async with self._session._stream(
+                "GET",
+                self._name,
+                *urlparts,
+                params={**params, "limit": limit},
+                headers=headers,
+            ) as resp:
+                async for row in _streaming.iter_rows(resp.aiter_text(), lazy=depth):
+                    yield row
+            return
+
+        startkey_docid = None
+        while limit is None or limit > 0:
+            count = page_size if limit is None else min(page_size, limit)
+            seen = 0
+            nextrow = None
+            # Ask for an extra row to find where the next page starts
+            async with (
+                self._session._stream(
+                    "GET",
+                    self._name,
+                    *urlparts,
+                    params={
+                        **params,
+                        "startkey_docid": startkey_docid,
+                        "limit": count + 1,
+                    },
+                    headers=headers,
+                ) as resp,
+                contextlib.aclosing(
+                    _streaming.iter_rows(resp.aiter_text(), lazy=depth)
+                ) as rows,
+            ):
+                async for row in rows:
+                    if seen == count:
+                        nextrow = row
+                        break
+                    seen += 1
+                    yield row
+            if nextrow is None:
+                return
+            if limit is not None:
+                limit -= count
+            params["startkey"] = self._session.codec.dumps(nextrow["key"]).decode(
+                "utf-8"
+            )
+            # Reduced rows don't have one, but their keys are unique anyway
+            startkey_docid = nextrow.get("id")
+
     async def iter_all_docs(
-        self, include_docs: bool = False
+        self,
+        include_docs: bool = False,
+        *,
+        startkey: str | None = None,
+        endkey: str | None = None,
+        keys: list[str] | None = None,
+        limit: int | None = None,
+        descending: bool = False,
+        inclusive_end: bool = True,
+        page_size: int | None = None,
     ) -> AsyncIterator[structs.AllDocs_DocRef]:
         """
         List all documents
 
-        TODO: More params
+        Rows are produced as they arrive. To avoid long-running requests on
+        large databases, give a ``page_size`` to fetch that many rows at a time.
 
         Args:
             include_docs: Pre-load documents
+            startkey: Start at this document ID
+            endkey: Stop at this document ID
+            keys: Only list these document IDs (missing and deleted ones are
+                skipped)
+            limit: Maximum number of documents to list
+            descending: List in reverse order (``startkey`` and ``endkey`` are
+                swapped)
+            inclusive_end: Include ``endkey``
+            page_size: Fetch this many rows per request
 
         See :http:get:`/{db}/_all_docs`
         """
-        resp = await self._session._request(
-            "GET",
-            self._name,
+        async for ref in self._iter_rows(
             "_all_docs",
             params={
                 "include_docs": include_docs,
+                "startkey": startkey,
+                "endkey": endkey,
+                "descending": descending,
+                "inclusive_end": inclusive_end,
             },
-            headers={
-                "Accept": "application/json",
-            },
-        )
-        blob = resp.json()
-        for ref in blob["rows"]:
-            if "doc" in ref:
+            keys=keys,
+            page_size=page_size,
+            limit=limit,
+            lazy=include_docs and getattr(self._session.loader, "lazy", False),
+        ):
+            if "error" in ref or ref["value"].get("deleted", False):
+                continue
+            if ref.get("doc") is not None:
                 doc = self._blob2doc(ref["doc"], self._name, ref["id"])
             else:
                 doc = None
@@ -467,7 +1654,589 @@ class Database:
                 _db=self, docid=ref["id"], rev=ref["value"]["rev"], _doc=doc
             )
 
-    # TODO: Mango searches
+    async def query_view(
+        self,
+        ddoc: str,
+        view: str,
+        *,
+        key=None,
+        keys: list | None = None,
+        startkey=None,
+        endkey=None,
+        limit: int | None = None,
+        descending: bool = False,
+        inclusive_end: bool = True,
+        include_docs: bool = False,
+        reduce: bool | None = None,
+        group: bool = False,
+        group_level: int | None = None,
+        stable: bool = False,
+        update: bool | Literal["lazy"] = True,
+        page_size: int | None = None,
+    ) -> AsyncIterator[structs.ViewRow]:
+        """
+        Query a view
+
+        Rows are produced as they arrive. To avoid long-running requests on
+        large views, give a ``page_size`` to fetch that many rows at a time.
+
+        Args:
+            ddoc: The design document, without the ``_design/`` prefix
+            view: The name of the view
+            key: Only rows with this key
+            keys: Only rows with these keys (sent in the body, so there can be
+                lots)
+            startkey: Start at this key
+            endkey: Stop at this key
+            limit: Maximum number of rows
+            descending: List in reverse order (``startkey`` and ``endkey`` are
+                swapped)
+            inclusive_end: Include ``endkey``
+            include_docs: Pre-load the documents that emitted the rows
+            reduce: Use the reduce function (by default, if the view has one)
+            group: Reduce to a row per distinct key
+            group_level: Reduce to a row per prefix of this many items of array
+                keys
+            stable: Use the same shards for the whole query
+            update: Whether to update the view first: ``True``, ``False``, or
+                ``"lazy"`` (after responding)
+            page_size: Fetch this many rows per request
+
+        See :http:get:`/{db}/_design/{ddoc}/_view/{view}`
+        """
+        async for row in self._iter_rows(
+            "_design",
+            ddoc,
+            "_view",
+            view,
+            params={
+                "key": key,
+                "startkey": startkey,
+                "endkey": endkey,
+                "descending": descending,
+                "inclusive_end": inclusive_end,
+                "include_docs": include_docs or None,
+                "reduce": reduce,
+                "group": group or None,
+                "group_level": group_level,
+                "stable": stable or None,
+                "update": None if update is True else update,
+            },
+            keys=keys,
+            page_size=page_size,
+            limit=limit,
+        ):
+            if row.get("doc") is not None:
+                # Might not be the emitting document, if the value is {"_id": ...}
+                doc = self._blob2doc(row["doc"], self._name, row["doc"]["_id"])
+            else:
+                doc = None
+            yield structs.ViewRow(
+                key=row["key"],
+                value=row["value"],
+                docid=row.get("id"),
+                _db=self,
+                _doc=doc,
+            )
+
+    async def iter_changes(
+        self,
+        since: str | None = None,
+        *,
+        feed: Literal["normal", "longpoll", "continuous", "eventsource"] = "normal",
+        include_docs: bool = False,
+        filter: str | None = None,
+        selector: dict | None = None,
+        doc_ids: list[str] | None = None,
+        limit: int | None = None,
+        heartbeat: int | None = 10_000,
+        checkpoint: str | None = None,
+        checkpoint_every: int = 100,
+    ) -> AsyncIterator[structs.Change]:
+        """
+        Follow the changes feed.
+
+        With ``feed="normal"``, this lists the changes so far and stops. The
+        other feeds wait for new changes forever (or until ``limit``),
+        reconnecting from the last seen sequence if the connection drops or the
+        server has trouble (see :attr:`CouchSession.retry_statuses`).
+
+        If ``checkpoint`` is given, progress is stored in the local document
+        ``_local/{checkpoint}`` and, if ``since`` isn't given, resumed from
+        there. Progress is saved every ``checkpoint_every`` changes and at the
+        end of every batch, so changes may be seen again after a restart, but
+        won't be skipped.
+
+        Args:
+            since: Sequence to start after (or ``"now"``)
+            feed: Kind of feed
+            include_docs: Pre-load documents
+            filter: Filter function, as ``ddoc/name``
+            selector: Only include documents matching this Mango selector
+            doc_ids: Only include these documents
+            limit: Stop after this many changes
+            heartbeat: How often (in ms) the server should send keep-alives
+            checkpoint: Name of a checkpoint to store progress in
+            checkpoint_every: How many changes between checkpoint saves
+
+        See :http:get:`/{db}/_changes`
+        """
+        params = {
+            "feed": feed,
+            "include_docs": include_docs,
+            "filter": filter,
+            "heartbeat": heartbeat if feed != "normal" else None,
+        }
+        body = {}
+        if selector is not None:
+            params["filter"] = "_selector"
+            body["selector"] = selector
+        if doc_ids is not None:
+            params["filter"] = "_doc_ids"
+            body["doc_ids"] = doc_ids
+        if feed == "normal":
+            timeout = httpx.USE_CLIENT_DEFAULT
+        else:
+            # The server can be quiet for a long time between changes
+            timeout = httpx.Timeout(
+                10.0, read=heartbeat / 1000 + 10 if heartbeat else None
+            )
+
+        ckrev = None
+        if checkpoint is not None:
+            cksince, ckrev = await self._load_checkpoint(checkpoint)
+            if since is None:
+                since = cksince
+
+        seen = unsaved = 0
+        delay = 0.1
+        while True:
+            try:
+                async with (
+                    self._session._stream(
+                        "POST" if body else "GET",
+                        self._name,
+                        "_changes",
+                        params={
+                            **params,
+                            "since": since,
+                            "limit": limit - seen if limit is not None else None,
+                        },
+                        **({"json": body} if body else {}),
+                        headers={
+                            "Accept": "application/json",
+                        },
+                        timeout=timeout,
+                    ) as resp,
+                    contextlib.aclosing(self._iter_changes_rows(resp, feed)) as rows,
+                ):
+                    async for row in rows:
+                        if "last_seq" in row:
+                            since = row["last_seq"]
+                            unsaved += 1
+                            continue
+                        yield self._row2change(row)
+                        # If we're here, the consumer is done with the row
+                        delay = 0.1
+                        since = row["seq"]
+                        seen += 1
+                        unsaved += 1
+                        if checkpoint is not None and unsaved >= checkpoint_every:
+                            ckrev = await self._save_checkpoint(
+                                checkpoint, since, ckrev
+                            )
+                            unsaved = 0
+                        if limit is not None and seen >= limit:
+                            break
+            except (httpx.TransportError, httpx.HTTPStatusError) as exc:
+                if feed == "normal" or (
+                    isinstance(exc, httpx.HTTPStatusError)
+                    and exc.response.status_code not in self._session.retry_statuses
+                ):
+                    raise
+                await anyio.sleep(delay)
+                delay = min(delay * 2, 30)
+                continue
+
+            if checkpoint is not None and unsaved:
+                ckrev = await self._save_checkpoint(checkpoint, since, ckrev)
+                unsaved = 0
+            if feed == "normal" or (limit is not None and seen >= limit):
+                break
+
+    async def _iter_changes_rows(self, resp: httpx.Response, feed: str):
+        """
+        Pull the rows out of a changes feed, as they arrive.
+
+        Produces the changes, and possibly a final ``{"last_seq": ...}``.
+        """
+        match feed:
+            case "normal" | "longpoll":
+                meta = {}
+                async for row in _streaming.iter_rows(
+                    resp.aiter_text(), "results", meta
+                ):
+                    yield row
+                if "last_seq" in meta:
+                    yield {"last_seq": meta["last_seq"]}
+            case "continuous":
+                async for line in resp.aiter_lines():
+                    if line.strip():
+                        yield self._session.codec.loads(line)
+            case "eventsource":
+                data = []
+                async for line in resp.aiter_lines():
+                    if line.startswith("data:"):
+                        data.append(line.removeprefix("data:").strip())
+                    elif not line and data:
+                        if event := "".join(data):
+                            yield self._session.codec.loads(event)
+                        data = []
+
+    def _row2change(self, row) -> structs.Change:
+        if row.get("doc") is not None and not row.get("deleted", False):
+            doc = self._blob2doc(row["doc"], self._name, row["id"])
+        else:
+            doc = None
+        return structs.Change(
+            _db=self,
+            seq=row["seq"],
+            docid=row["id"],
+            revs=[change["rev"] for change in row["changes"]],
+            deleted=row.get("deleted", False),
+            _doc=doc,
+        )
+
+    async def _load_checkpoint(
+        self, name: str, field: str = "seq"
+    ) -> tuple[str | None, str | None]:
+        """
+        Get the (position, revision) of a checkpoint.
+        """
+        try:
+            resp = await self._session._request(
+                "GET",
+                self._name,
+                "_local",
+                name,
+                headers={"Accept": "application/json"},
+            )
+        except Missing:
+            return None, None
+        blob = self._session.codec.loads(resp.content)
+        return blob.get(field), blob["_rev"]
+
+    async def _save_checkpoint(
+        self, name: str, seq: str, rev: str | None, field: str = "seq"
+    ) -> str:
+        """
+        Store a checkpoint, returning the new revision.
+        """
+        resp = await self._session._request(
+            "PUT",
+            self._name,
+            "_local",
+            name,
+            json={field: seq, **({"_rev": rev} if rev else {})},
+            headers={"Accept": "application/json"},
+        )
+        return self._session.codec.loads(resp.content)["rev"]
+
+    async def _clear_checkpoint(self, name: str, rev: str):
+        """
+        Forget a checkpoint.
+        """
+        await self._session._request(
+            "DELETE",
+            self._name,
+            "_local",
+            name,
+            params={"rev": rev},
+            headers={"Accept": "application/json"},
+        )
+
+    @staticmethod
+    def _find_body(selector, fields, sort, use_index, limit):
+        return {
+            "selector": selector,
+            **({"fields": fields} if fields is not None else {}),
+            **({"sort": sort} if sort is not None else {}),
+            **({"use_index": use_index} if use_index is not None else {}),
+            **({"limit": limit} if limit is not None else {}),
+        }
+
+    async def find(
+        self,
+        selector: dict,
+        *,
+        fields: list[str] | None = None,
+        sort: list[str | dict] | None = None,
+        use_index: str | list[str] | None = None,
+        limit: int | None = None,
+        page_size: int = 100,
+    ) -> AsyncIterator:
+        """
+        Search for documents using Mango.
+
+        Fetches ``page_size`` documents at a time, following the bookmarks
+        CouchDB gives back.
+
+        If ``fields`` is given, the results are partial documents, so they're
+        produced as plain dictionaries instead of going through the loader.
+
+        Args:
+            selector: The Mango selector to search with
+            fields: Only return these fields
+            sort: Sort order, like ``[{"spam": "desc"}]``
+            use_index: Index to use, as ``ddoc`` or ``[ddoc, name]``
+            limit: Maximum number of documents to produce
+            page_size: Number of documents to fetch per request
+
+        See :http:post:`/{db}/_find`
+        """
+        bookmark = None
+        while limit is None or limit > 0:
+            count = page_size if limit is None else min(page_size, limit)
+            meta = {}
+            seen = 0
+            async with self._session._stream(
+                "POST",
+                self._name,
+                "_find",
+                json={
+                    **self._find_body(selector, fields, sort, use_index, count),
+                    **({"bookmark": bookmark} if bookmark is not None else {}),
+                },
+                headers={
+                    "Accept": "application/json",
+                },
+            ) as resp:
+                async for blob in _streaming.iter_rows(resp.aiter_text(), "docs", meta):
+                    seen += 1
+                    if fields is not None:
+                        yield blob
+                    else:
+                        yield self._blob2doc(blob, self._name, ...)
+            if seen < count:
+                break
+            if limit is not None:
+                limit -= seen
+            bookmark = meta["bookmark"]
+
+    async def explain(
+        self,
+        selector: dict,
+        *,
+        fields: list[str] | None = None,
+        sort: list[str | dict] | None = None,
+        use_index: str | list[str] | None = None,
+        limit: int | None = None,
+    ) -> dict:
+        """
+        Find out how a :meth:`find` would be done, particularly which index
+        would be used.
+
+        If ``rv["index"]["name"] == "_all_docs"``, the query is not using an
+        index and will scan the whole database.
+
+        See :http:post:`/{db}/_explain`
+        """
+        resp = await self._session._request(
+            "POST",
+            self._name,
+            "_explain",
+            json=self._find_body(selector, fields, sort, use_index, limit),
+            headers={
+                "Accept": "application/json",
+            },
+            idempotent=True,
+        )
+        return self._session.codec.loads(resp.content)
+
+    async def create_index(
+        self,
+        fields: list[str | dict],
+        *,
+        name: str | None = None,
+        ddoc: str | None = None,
+        partial_filter_selector: dict | None = None,
+    ) -> dict:
+        """
+        Create a Mango index, if it doesn't already exist.
+
+        Args:
+            fields: Fields to index, like ``["spam", {"eggs": "desc"}]``
+            name: Name of the index
+            ddoc: Design document to put it in (without ``_design/``)
+            partial_filter_selector: Only index documents matching this
+
+        See :http:post:`/{db}/_index`
+        """
+        index = {"fields": fields}
+        if partial_filter_selector is not None:
+            index["partial_filter_selector"] = partial_filter_selector
+        resp = await self._session._request(
+            "POST",
+            self._name,
+            "_index",
+            json={
+                "index": index,
+                "type": "json",
+                **({"name": name} if name is not None else {}),
+                **({"ddoc": ddoc} if ddoc is not None else {}),
+            },
+            headers={
+                "Accept": "application/json",
+            },
+        )
+        return self._session.codec.loads(resp.content)
+
+    async def list_indexes(self) -> list[dict]:
+        """
+        List the Mango indexes.
+
+        See :http:get:`/{db}/_index`
+        """
+        resp = await self._session._request(
+            "GET",
+            self._name,
+            "_index",
+            headers={
+                "Accept": "application/json",
+            },
+        )
+        return self._session.codec.loads(resp.content)["indexes"]
+
+    async def migrate_docs(
+        self,
+        *,
+        page_size: int = 500,
+        concurrency: int = 4,
+        rate: float | None = None,
+        checkpoint: str | None = "chaise-migrate",
+        progress: Callable[[structs.MigrationProgress], None] | None = None,
+    ) -> structs.MigrationProgress:
+        """
+        Run every document of an old type through its migrations and save it,
+        so that they don't have to be migrated on every read.
+
+        The session's :attr:`~CouchSession.loader` must be a
+        :class:`DocumentRegistry`.
+
+        Documents that change while being migrated are skipped and reported as
+        conflicts. They're still migrated when they're loaded, and running this
+        again will pick them up.
+
+        Args:
+            page_size: Scan and write this many documents per request
+            concurrency: Maximum number of writes in flight
+            rate: Maximum number of documents written per second
+            checkpoint: Name of a local document to record progress in, so
+                that an interrupted run picks up where it left off. Removed
+                once the whole database has been handled.
+            progress: Called with the running totals as batches finish
+
+        Raises:
+            TypeError: The loader doesn't handle migrations
+        """
+        loader = self._session.get_loader()
+        if not isinstance(loader, DocumentRegistry):
+            raise TypeError(f"{loader!r} is not a DocumentRegistry")
+
+        stats = structs.MigrationProgress()
+        ckrev = None
+        if checkpoint is not None:
+            stats.position, ckrev = await self._load_checkpoint(checkpoint, "docid")
+
+        # Batches in the order they were read, so the checkpoint only covers
+        # ones that have finished
+        pending = []
+        lock = anyio.Lock()
+        limit = anyio.Semaphore(concurrency)
+
+        async def finish(entry):
+            nonlocal ckrev
+            entry["done"] = True
+            async with lock:
+                position = stats.position
+                while pending and pending[0]["done"]:
+                    position = pending.pop(0)["upto"]
+                if checkpoint is not None and position != stats.position:
+                    ckrev = await self._save_checkpoint(
+                        checkpoint, position, ckrev, "docid"
+                    )
+                stats.position = position
+                if progress is not None:
+                    progress(stats)
+
+        async def write(entry, blobs):
+            try:
+                results = await self._bulk_docs(
+                    [(None, blob) for blob in blobs],
+                    max_docs=page_size,
+                    max_bytes=4 * 1024 * 1024,
+                )
+                for res in results:
+                    if isinstance(res.error, Conflict):
+                        stats.conflicts.append(res.docid)
+                    elif res.error is not None:
+                        stats.rejected.append(res.docid)
+                    else:
+                        stats.migrated += 1
+                await finish(entry)
+            finally:
+                limit.release()
+
+        ready_at = 0.0
+
+        async def dispatch(tg, upto, batch):
+            nonlocal ready_at
+            entry = {"upto": upto, "done": False}
+            pending.append(entry)
+            if not batch:
+                await finish(entry)
+                return
+            if rate is not None:
+                now = anyio.current_time()
+                if ready_at > now:
+                    await anyio.sleep(ready_at - now)
+                ready_at = max(ready_at, now) + len(batch) / rate
+            docs = _loadj_many(loader, [dict(blob) for blob in batch])
+            blobs = _dumpj_many(loader, docs)
+            for old, new in zip(batch, blobs):
+                # Carry over what the loader doesn't know about
+                for key in ("_id", "_rev", "_attachments"):
+                    if key in old:
+                        new[key] = old[key]
+            await limit.acquire()
+            tg.start_soon(write, entry, blobs)
+
+        async with anyio.create_task_group() as tg:
+            batch = []
+            upto = None
+            async for row in self._iter_rows(
+                "_all_docs",
+                params={"include_docs": True, "startkey": stats.position},
+                page_size=page_size,
+            ):
+                if row["id"] == stats.position:
+                    continue
+                stats.scanned += 1
+                upto = row["id"]
+                blob = row.get("doc")
+                if blob is not None and loader._needs_migration(blob):
+                    stats.found += 1
+                    batch.append(blob)
+                if len(batch) >= page_size or stats.scanned % page_size == 0:
+                    await dispatch(tg, upto, batch)
+                    batch = []
+            if upto is not None:
+                await dispatch(tg, upto, batch)
+
+        if checkpoint is not None and ckrev is not None:
+            await self._clear_checkpoint(checkpoint, ckrev)
+        return stats
+
     # TODO: Database operations
 
 
@@ -486,9 +2255,68 @@ class SessionPool:
     #: Class to use for sessions
     session_class: type[CouchSession]
 
+    #: After this many failed requests in a row, a server is avoided by
+    #: sessions (see :attr:`CouchSession.max_retries`)...
+    breaker_threshold: int = 5
+
+    #: ...for this many seconds, before it's given another try
+    breaker_cooldown: float = 10.0
+
+    #: Retries allowed for each request made, on average, across all sessions
+    retry_ratio: float = 0.1
+
+    #: Retries (or hedges) that can be made in a burst, beyond
+    #: :attr:`retry_ratio` (or :attr:`hedge_ratio`)
+    retry_reserve: float = 10.0
+
+    #: If set, reads (that is, idempotent requests) that take longer than
+    #: this percentile of recent reads are also sent to another server, and
+    #: whichever answers first is used. ``0.95`` hedges the slowest 5%.
+    hedge_percentile: float | None = None
+
+    #: Reads are never hedged sooner than this many seconds
+    hedge_min_delay: float = 0.005
+
+    #: Hedges allowed for each read, on average, across all sessions
+    hedge_ratio: float = 0.05
+
+    #: How many recent reads :attr:`hedge_percentile` is taken from
+    hedge_window: int = 1000
+
+    #: Number of reads that could have been hedged, once there were enough
+    #: recent reads to know what's slow
+    hedgeable: int
+
+    #: Number of reads that were also sent to another server
+    hedged: int
+
+    #: Number of hedged reads where the other server answered first
+    hedge_wins: int
+
     def __init__(self):
         super().__init__()
         self._client = self.make_client()
+        auth = self.make_auth()
+        if auth is not None:
+            self._client.auth = auth
+        self._cache = self.make_cache()
+        self._codec = self.make_codec()
+        self._breakers = {}
+        self._retry_budget = _RetryBudget(self.retry_reserve)
+        self._hedge_budget = _RetryBudget(self.retry_reserve)
+        self._latencies = collections.deque(maxlen=self.hedge_window)
+        self._unsorted = 0
+        self._hedge_after = None
+        self.hedgeable = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+
+    @property
+    def hedge_rate(self) -> float:
+        """
+        The fraction of reads that have been hedged so far.
+        """
+        return self.hedged / self.hedgeable if self.hedgeable else 0.0
 
     def make_client(self) -> httpx.AsyncClient:
         """
@@ -496,6 +2324,42 @@ class SessionPool:
         """
         return httpx.AsyncClient(http2=True, follow_redirects=True)
 
+    def make_codec(self) -> JsonCodec:
+        """
+        Produce the JSON codec shared by all sessions.
+
+        By default, the fastest one installed. Override this to pick one, like::
+
+            def make_codec(self):
+                return chaise.codec.JsonCodec()
+        """
+        return default_codec()
+
+    def make_auth(self) -> httpx.Auth | None:
+        """
+        Produce the authentication used by all sessions, or ``None`` to use
+        the credentials in the server URLs as they are (which sends the
+        password with every request).
+
+        Override this to log in with a cookie instead, like::
+
+            def make_auth(self):
+                return chaise.auth.CookieAuth()
+        """
+        return None
+
+    def make_cache(self) -> DocumentCache | None:
+        """
+        Produce the document cache shared by all sessions, or ``None`` to
+        disable caching.
+
+        Override this to enable it, like::
+
+            def make_cache(self):
+                return chaise.cache.DocumentCache(max_entries=10_000)
+        """
+        return None
+
     async def iter_servers(self) -> AsyncIterator[str]:
         """
         Produce the list of potential servers.
@@ -507,9 +2371,57 @@ class SessionPool:
             yield
 
     async def _check_server(self, url: httpx.URL):
-        resp = await self._client.get(url.join("_up"))
+        resp = await self._client.get(
+            url.join("_up"), extensions={_ROOT_EXTENSION: url}
+        )
         return resp.is_success
 
+    def _make_session(self, url: httpx.URL) -> CouchSession:
+        return self.session_class(
+            self._client, url, cache=self._cache, codec=self._codec, pool=self
+        )
+
+    def _server_allowed(self, url: str) -> bool:
+        breaker = self._breakers.get(url)
+        return breaker is None or breaker.allows(self.breaker_cooldown)
+
+    def _server_failed(self, url: str):
+        try:
+            breaker = self._breakers[url]
+        except KeyError:
+            breaker = self._breakers[url] = _Breaker()
+        breaker.failed(self.breaker_threshold)
+
+    def _server_succeeded(self, url: str):
+        breaker = self._breakers.get(url)
+        if breaker is not None:
+            breaker.succeeded()
+
+    def _read_finished(self, seconds: float):
+        self._latencies.append(seconds)
+        self._unsorted += 1
+        # Sorting the window after every read would cost more than hedging saves
+        if self._unsorted >= 32 or (
+            self._hedge_after is None and len(self._latencies) >= 20
+        ):
+            ordered = sorted(self._latencies)
+            index = int(self.hedge_percentile * (len(ordered) - 1))
+            self._hedge_after = max(ordered[index], self.hedge_min_delay)
+            self._unsorted = 0
+
+    async def _failover_server(self, current: str) -> httpx.URL | None:
+        """
+        A server for a session to move to from ``current``, if there is one.
+        """
+        try:
+            async for url in self.iter_servers():
+                url = httpx.URL(url)
+                if str(url) != current and self._server_allowed(str(url)):
+                    return url
+        except OSError:
+            # Can't find any others (eg, DNS is down too)
+            return None
+
     async def session(self) -> CouchSession:
         """
         Get a session
@@ -517,4 +2429,4 @@ class SessionPool:
         async for url in self.iter_servers():
             url = httpx.URL(url)
             if await self._check_server(url):
-                return self.session_class(self._client, url)
+                return self._make_session(url)
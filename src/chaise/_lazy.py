@@ -0,0 +1,176 @@
+"""
+Finding the parts of JSON text without decoding them.
+"""
+
+import json
+import re
+from collections.abc import Mapping
+from json.decoder import scanstring
+
+from .codec import RawJson
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_SCALAR = re.compile(r"[^\s,:\]}]+")
+_PLAIN = re.compile(r'[^"\[\]{}]*')
+
+# Scanning a container in Python costs about as much per string or bracket as
+# the C decoder does per character. So containers where those are dense are
+# cheaper to decode and throw away.
+_SAMPLE = 1024
+_DECODE_COST = 30
+
+
+def _skip_string(text: str, pos: int) -> int | None:
+    end = text.find('"', pos + 1)
+    if end != -1 and text[end - 1] != "\\":
+        return end + 1
+    # Escapes are rare enough to leave to the decoder
+    try:
+        return scanstring(text, pos + 1)[1]
+    except json.JSONDecodeError:
+        return None
+
+
+def _skip_container(text: str, pos: int) -> int | None:
+    sample = text[pos : pos + _SAMPLE]
+    if sum(map(sample.count, '"[]{}')) * _DECODE_COST > len(sample):
+        try:
+            return _decoder.raw_decode(text, pos)[1]
+        except json.JSONDecodeError:
+            return None
+
+    plain = _PLAIN.match
+    depth = 0
+    while (pos := plain(text, pos).end()) < len(text):
+        char = text[pos]
+        if char == '"':
+            pos = _skip_string(text, pos)
+            if pos is None:
+                return None
+            continue
+        pos += 1
+        if char == "[" or char == "{":
+            depth += 1
+        else:
+            depth -= 1
+            if depth == 0:
+                return pos
+    return None
+
+
+def skip(text: str, pos: int) -> int | None:
+    """
+    Find the end of the JSON value starting at ``pos``, mostly without decoding
+    it.
+
+    Returns ``None`` if the text ends before the value does. The value isn't
+    checked beyond that.
+    """
+    char = text[pos : pos + 1]
+    if char == '"':
+        return _skip_string(text, pos)
+    elif char == "[" or char == "{":
+        return _skip_container(text, pos)
+    else:
+        match = _SCALAR.match(text, pos)
+        # A number could carry on in the next chunk
+        if match is None or match.end() == len(text):
+            return None
+        return match.end()
+
+
+def _index(text: str, pos: int, depth: int) -> tuple[dict, int]:
+    """
+    Find the members of the object starting at ``pos``.
+
+    Returns the (undecoded) members and where the object ends. Members that are
+    objects are indexed too, down to ``depth`` levels.
+    """
+    space = _WHITESPACE.match
+    if text[pos : pos + 1] != "{":
+        raise json.JSONDecodeError("Expecting '{'", text, pos)
+    members = {}
+    pos = space(text, pos + 1).end()
+    if text[pos : pos + 1] == "}":
+        return members, pos + 1
+    while True:
+        if text[pos : pos + 1] != '"':
+            raise json.JSONDecodeError("Expecting property name", text, pos)
+        key, pos = scanstring(text, pos + 1)
+        pos = space(text, pos).end()
+        if text[pos : pos + 1] != ":":
+            raise json.JSONDecodeError("Expecting ':' delimiter", text, pos)
+        start = space(text, pos + 1).end()
+        if depth > 1 and text[start : start + 1] == "{":
+            value = LazyObject(text, start, depth=depth - 1)
+            end = value.raw.end
+        else:
+            end = skip(text, start)
+            if end is None:
+                raise json.JSONDecodeError("Unterminated value", text, start)
+            value = RawJson(text, start, end)
+        members[key] = value
+        pos = space(text, end).end()
+        char = text[pos : pos + 1]
+        if char == "}":
+            return members, pos + 1
+        elif char != ",":
+            raise json.JSONDecodeError("Expecting ',' delimiter", text, pos)
+        pos = space(text, pos + 1).end()
+
+
+class LazyObject(Mapping):
+    """
+    A JSON object, read-only, that only decodes members when they're read.
+
+    Members that are objects are themselves :class:`LazyObject`. The first
+    ``depth`` levels are found up front, deeper ones when they're read.
+    """
+
+    __slots__ = ("members", "raw")
+
+    #: The members, as :class:`~chaise.codec.RawJson` (or :class:`LazyObject`,
+    #: within ``depth``)
+    members: dict
+
+    #: The whole object
+    raw: RawJson
+
+    def __init__(self, text: str, pos: int = 0, *, depth: int = 1):
+        self.members, end = _index(text, pos, depth)
+        self.raw = RawJson(text, pos, end)
+
+    def __getitem__(self, key):
+        value = self.members[key]
+        if isinstance(value, LazyObject):
+            return value
+        elif value.source[value.start] == "{":
+            return LazyObject(value.source, value.start)
+        return value.decode()
+
+    def __iter__(self):
+        return iter(self.members)
+
+    def __len__(self):
+        return len(self.members)
+
+    def __contains__(self, key):
+        return key in self.members
+
+    def __repr__(self):
+        return f"<{type(self).__name__} {str(self.raw)!r}>"
+
+    def moved(self, text: str, shift: int) -> "LazyObject":
+        """
+        The same object, found ``shift`` characters earlier in ``text``.
+        """
+        new = LazyObject.__new__(LazyObject)
+        new.members = {
+            key: value.moved(text, shift)
+            if isinstance(value, LazyObject)
+            else RawJson(text, value.start - shift, value.end - shift)
+            for key, value in self.members.items()
+        }
+        new.raw = RawJson(text, self.raw.start - shift, self.raw.end - shift)
+        return new
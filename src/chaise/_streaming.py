@@ -0,0 +1,184 @@
+"""
+Incremental parsing of large JSON responses, like the rows of a view.
+"""
+
+import json
+import re
+from typing import AsyncIterator
+
+from ._lazy import LazyObject
+
+_decoder = json.JSONDecoder()
+_NONSPACE = re.compile(r"\S")
+
+
+class _Reader:
+    """
+    Pulls JSON tokens out of a stream of text, only keeping the unconsumed part
+    in memory.
+
+    New chunks are held aside until something needs to look at them, so that a
+    token spanning many chunks isn't copied into the buffer once per chunk.
+    """
+
+    def __init__(self, chunks: AsyncIterator[str]):
+        self._chunks = aiter(chunks)
+        self.buf = ""
+        self.pos = 0
+        self._pending = []
+        self._pending_size = 0
+
+    @property
+    def available(self) -> int:
+        """
+        How much unconsumed text there is, including chunks not in the buffer
+        yet.
+        """
+        return len(self.buf) - self.pos + self._pending_size
+
+    async def _more(self) -> bool:
+        try:
+            chunk = await anext(self._chunks)
+        except StopAsyncIteration:
+            return False
+        self._pending.append(chunk)
+        self._pending_size += len(chunk)
+        return True
+
+    def _flush(self):
+        """
+        Move the pending chunks into the buffer, dropping the consumed part.
+        """
+        if self._pending:
+            self.buf = self.buf[self.pos :] + "".join(self._pending)
+            self.pos = 0
+            self._pending = []
+            self._pending_size = 0
+
+    async def peek(self) -> str:
+        """
+        Skip whitespace and return the next character (or ``""`` at the end).
+        """
+        while (match := _NONSPACE.search(self.buf, self.pos)) is None:
+            self.pos = len(self.buf)
+            if not await self._more():
+                return ""
+            self._flush()
+        self.pos = match.start()
+        return self.buf[self.pos]
+
+    async def expect(self, chars: str) -> str:
+        """
+        Consume one of the given characters.
+        """
+        char = await self.peek()
+        if not char or char not in chars:
+            raise ValueError(f"Expected one of {chars!r}, got {char!r}")
+        self.pos += 1
+        return char
+
+    async def value(self):
+        """
+        Consume and decode a single JSON value.
+        """
+        await self.peek()
+        tried = 0
+        while True:
+            # Only retry once the buffer has doubled, so that large values
+            # aren't decoded (or copied) over and over.
+            if self.available > 2 * tried:
+                self._flush()
+                tried = len(self.buf) - self.pos
+                try:
+                    obj, end = _decoder.raw_decode(self.buf, self.pos)
+                except json.JSONDecodeError:
+                    pass
+                else:
+                    # A number at the end of the buffer might not be finished
+                    if end < len(self.buf):
+                        self.pos = end
+                        return obj
+            if not await self._more():
+                self._flush()
+                obj, self.pos = _decoder.raw_decode(self.buf, self.pos)
+                return obj
+
+    async def lazy_object(self, depth: int) -> LazyObject:
+        """
+        Consume a JSON object without decoding it, see :class:`LazyObject`.
+        """
+        await self.peek()
+        tried = 0
+        while True:
+            if self.available > 2 * tried:
+                self._flush()
+                tried = len(self.buf) - self.pos
+                try:
+                    obj = LazyObject(self.buf, self.pos, depth=depth)
+                except ValueError:
+                    pass
+                else:
+                    break
+            if not await self._more():
+                self._flush()
+                obj = LazyObject(self.buf, self.pos, depth=depth)
+                break
+        # Don't keep the rest of the buffer alive
+        start, self.pos = self.pos, obj.raw.end
+        return obj.moved(self.buf[start : self.pos], start)
+
+
+async def _iter_array(reader: _Reader, lazy: int) -> AsyncIterator:
+    if await reader.peek() == "]":
+        reader.pos += 1
+        return
+    while True:
+        if lazy:
+            yield await reader.lazy_object(lazy)
+        else:
+            yield await reader.value()
+        if await reader.expect(",]") == "]":
+            return
+
+
+async def iter_rows(
+    chunks: AsyncIterator[str],
+    key: str | None = "rows",
+    meta: dict | None = None,
+    *,
+    lazy: int = 0,
+) -> AsyncIterator:
+    """
+    Produce the items of a JSON array as they arrive, keeping at most about one
+    item in memory.
+
+    The array is either the whole document (``key=None``) or the member
+    ``key`` of a top-level object. In the latter case, the other members are
+    put into ``meta`` (the ones after the array aren't available until the end).
+
+    If ``lazy`` is given, the items are objects, and are produced as
+    :class:`~chaise._lazy.LazyObject` indexed that many levels deep.
+    """
+    reader = _Reader(chunks)
+    if key is None:
+        await reader.expect("[")
+        async for item in _iter_array(reader, lazy):
+            yield item
+        return
+
+    await reader.expect("{")
+    if await reader.peek() == "}":
+        return
+    while True:
+        name = await reader.value()
+        await reader.expect(":")
+        if name == key:
+            await reader.expect("[")
+            async for item in _iter_array(reader, lazy):
+                yield item
+        elif meta is not None:
+            meta[name] = await reader.value()
+        else:
+            await reader.value()
+        if await reader.expect(",}") == "}":
+            return
@@ -15,40 +15,120 @@ except ImportError:
 # Omitting orjson, even though it's a preconf, because I'm not confident it's a
 # drop-in equivalent to (u)json
 
-from . import DocumentRegistry
+from . import METADATA_SLOTS, DocumentRegistry
+
+
+def make_converter(*, detailed_validation: bool = True) -> Converter:
+    """
+    Make a converter set up for talking to CouchDB.
+
+    Args:
+        detailed_validation: Collect every problem with a document when
+            loading fails, instead of stopping at the first. Turning this off
+            makes loading faster.
+    """
+    conv = Converter(
+        unstruct_collection_overrides={
+            AbstractSet: list,
+        },
+        detailed_validation=detailed_validation,
+    )
+    configure_converter(conv)
+    return conv
+
+
+def _structure_hook(conv: Converter, cls: type):
+    try:
+        return conv.get_structure_hook(cls)
+    except AttributeError:  # cattrs < 24.1
+        return conv._structure_func.dispatch(cls)
+
+
+def _unstructure_hook(conv: Converter, cls: type):
+    try:
+        return conv.get_unstructure_hook(cls)
+    except AttributeError:  # cattrs < 24.1
+        return conv._unstructure_func.dispatch(cls)
 
 
 # All implementations exhibit the conversions:
 # * bytes are wrapped in base85
 # * dates & datetimes are ISO 8601
 #: The converter used when talking to CouchDB.
-converter = Converter(
-    unstruct_collection_overrides={
-        AbstractSet: list,
-    }
-)
-configure_converter(converter)
+converter = make_converter()
 
 
 class AttrsRegistry(DocumentRegistry):
+    #: The converter used by this registry. Give a registry its own to
+    #: customize it, like::
+    #:
+    #:     class MyRegistry(AttrsRegistry):
+    #:         converter = chaise.attrs.make_converter(detailed_validation=False)
+    #:
+    #: Register any hooks on it before registering documents.
+    converter: Converter = converter
+
+    # class -> specialized cattrs hooks
+    _structurers = {}
+    _unstructurers = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._structurers = {}
+        cls._unstructurers = {}
+
+    @classmethod
+    def _compile(cls, klass: type):
+        cls._structurers[klass] = _structure_hook(cls.converter, klass)
+        cls._unstructurers[klass] = _unstructure_hook(cls.converter, klass)
+
     @classmethod
     def document(cls, name: str, /, **flags):
         """
         Registers a class as a document of the given type.
 
-        Passes it through :func:`attrs.define`
+        Passes it through :func:`attrs.define`, but classes aren't slotted
+        unless ``slots=True`` is given. Slotted classes get a subclass with
+        room for chaise's metadata (see :data:`chaise.METADATA_SLOTS`).
         """
         func = super().document(name)
+        flags = {"slots": False, **flags}
 
         def _(klass: type):
-            # Disable slots so chaise can attach extra data
-            klass = attrs.mutable(klass, slots=False, **flags)
+            klass = attrs.mutable(klass, **flags)
+            if flags["slots"] and not hasattr(klass, METADATA_SLOTS[0]):
+                klass = type(klass)(
+                    klass.__name__,
+                    (klass,),
+                    {
+                        "__slots__": METADATA_SLOTS,
+                        "__module__": klass.__module__,
+                        "__qualname__": klass.__qualname__,
+                        "__doc__": klass.__doc__,
+                    },
+                )
+            try:
+                cls._compile(klass)
+            except NameError:
+                # Forward references that can't be resolved yet, so wait until
+                # it's used
+                pass
             return func(klass)
 
         return _
 
     def load_doc(self, cls: type, blob: dict):
-        return converter.structure(blob, cls)
+        try:
+            hook = self._structurers[cls]
+        except KeyError:
+            self._compile(cls)
+            hook = self._structurers[cls]
+        return hook(blob, cls)
 
     def dump_doc(self, doc) -> dict:
-        return converter.unstructure(doc)
+        try:
+            hook = self._unstructurers[type(doc)]
+        except KeyError:
+            self._compile(type(doc))
+            hook = self._unstructurers[type(doc)]
+        return hook(doc)
@@ -0,0 +1,135 @@
+"""
+Logging in to CouchDB.
+"""
+
+import base64
+import http.cookies
+import time
+
+import anyio
+import httpx
+
+# CouchDB's default [chttpd_auth] timeout
+_DEFAULT_MAX_AGE = 600
+
+# Sessions put the server URL in requests under this, so that logging in
+# works for servers that aren't at the root of their host
+_ROOT_EXTENSION = "chaise.root"
+
+
+class _Login:
+    def __init__(self):
+        self.cookie = None
+        #: When to log in (again), whether or not there's a cookie (monotonic)
+        self.refresh_at = 0.0
+        self.lock = anyio.Lock()
+
+    def is_due(self) -> bool:
+        return time.monotonic() >= self.refresh_at
+
+
+def _basic(username: str, password: str) -> str:
+    token = base64.b64encode(f"{username}:{password}".encode("utf-8"))
+    return f"Basic {token.decode('ascii')}"
+
+
+class CookieAuth(httpx.Auth):
+    """
+    Logs in once with the username and password in the server URL (using
+    :http:post:`/_session`), and then sends the session cookie instead.
+
+    With Basic authentication, CouchDB has to hash the password for every
+    request, which is deliberately slow. Checking a cookie is cheap.
+
+    The cookie is renewed once ``refresh_after`` of its lifetime has passed
+    (CouchDB also renews it as it's used). If the server rejects it anyway,
+    requests log in again and are sent once more. If logging in doesn't work,
+    requests fall back to Basic authentication, and logging in isn't tried
+    again for ``retry_after`` seconds.
+
+    Share one between sessions using :meth:`~chaise.SessionPool.make_auth`.
+    """
+
+    requires_request_body = True
+
+    #: Number of times :http:post:`/_session` was called
+    logins: int
+
+    def __init__(self, *, refresh_after: float = 0.9, retry_after: float = 60.0):
+        self.refresh_after = refresh_after
+        self.retry_after = retry_after
+        self.logins = 0
+        self._logins = {}
+
+    def _login_request(self, root: httpx.URL) -> httpx.Request:
+        return httpx.Request(
+            "POST",
+            root.join("_session"),
+            json={"name": root.username, "password": root.password},
+            headers={"Accept": "application/json"},
+        )
+
+    def _update(self, login: _Login, response: httpx.Response) -> bool:
+        """
+        Pick up the cookie from a response, if it set one.
+        """
+        for header in response.headers.get_list("Set-Cookie"):
+            cookie = http.cookies.SimpleCookie(header)
+            if "AuthSession" not in cookie:
+                continue
+            morsel = cookie["AuthSession"]
+            if not morsel.value:
+                # Logged out
+                login.cookie = None
+                login.refresh_at = 0.0
+                return False
+            max_age = int(morsel["max-age"] or _DEFAULT_MAX_AGE)
+            login.cookie = morsel.value
+            login.refresh_at = time.monotonic() + max_age * self.refresh_after
+            return True
+        return False
+
+    async def async_auth_flow(self, request: httpx.Request):
+        username = request.url.username
+        if not username:
+            yield request
+            return
+
+        url = request.url
+        # Requests not from a session are assumed to be for the whole host
+        root = request.extensions.get(_ROOT_EXTENSION) or url.join("/")
+        key = root.scheme, root.host, root.port, root.path, username
+        try:
+            login = self._logins[key]
+        except KeyError:
+            login = self._logins[key] = _Login()
+
+        for attempt in range(2):
+            if login.is_due():
+                async with login.lock:
+                    # Someone else might have logged in while we waited
+                    if login.is_due():
+                        self.logins += 1
+                        response = yield self._login_request(root)
+                        if not (response.is_success and self._update(login, response)):
+                            # Use Basic for a while, rather than paying for a
+                            # failed login on top of every request
+                            login.cookie = None
+                            login.refresh_at = time.monotonic() + self.retry_after
+
+            sent = login.cookie
+            if sent is None:
+                request.headers.pop("Cookie", None)
+                request.headers["Authorization"] = _basic(username, url.password)
+            else:
+                request.headers.pop("Authorization", None)
+                request.headers["Cookie"] = f"AuthSession={sent}"
+            response = yield request
+
+            self._update(login, response)
+            if response.status_code != 401 or sent is None or attempt:
+                return
+            # The cookie's no good (eg, the server restarted with a new secret)
+            if login.cookie == sent:
+                login.cookie = None
+                login.refresh_at = 0.0
@@ -0,0 +1,260 @@
+"""
+Client-side caching of documents.
+"""
+
+import collections
+import dataclasses
+import time
+
+import anyio
+import httpx
+
+
+@dataclasses.dataclass
+class CacheEntry:
+    """
+    A document as it was last seen on the server.
+    """
+
+    #: The revision of the document
+    rev: str
+
+    #: The ETag the server gave for it
+    etag: str
+
+    #: The undecoded JSON body
+    raw: bytes
+
+    #: :meth:`DocumentCache.stamp` from when this was fetched
+    stamp: int | None = None
+
+
+class DocumentCache:
+    """
+    A bounded LRU cache of documents, keyed by database and document ID.
+
+    Stores the raw body, so every read still produces a fresh document. The
+    latest revision of a document is revalidated with the server (using
+    ``If-None-Match``), while specifically requested revisions are immutable
+    and served without asking.
+
+    Share one between sessions using :meth:`~chaise.SessionPool.make_cache`.
+    """
+
+    #: Number of reads served without downloading the document
+    hits: int
+
+    #: Number of reads that had to download the document
+    misses: int
+
+    def __init__(self, max_entries: int = 10_000, max_bytes: int = 64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries = collections.OrderedDict()
+        self._nbytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Total size of the cached bodies.
+        """
+        return self._nbytes
+
+    def get(self, db: str, docid: str, rev: str | None = None) -> CacheEntry | None:
+        """
+        Look up a document. If ``rev`` is given, only that revision will do.
+        """
+        keys = [(db, docid, rev), (db, docid)] if rev else [(db, docid)]
+        for key in keys:
+            entry = self._entries.get(key)
+            if entry is not None and (rev is None or entry.rev == rev):
+                self._entries.move_to_end(key)
+                return entry
+
+    def put(self, db: str, docid: str, entry: CacheEntry, *, pinned: bool = False):
+        """
+        Store a document.
+
+        If ``pinned``, it's stored as that specific revision instead of as the
+        latest version of the document.
+        """
+        key = (db, docid, entry.rev) if pinned else (db, docid)
+        self._remove(key)
+        self._entries[key] = entry
+        self._nbytes += len(entry.raw)
+        while self._entries and (
+            len(self._entries) > self.max_entries or self._nbytes > self.max_bytes
+        ):
+            self._remove(next(iter(self._entries)))
+
+    def evict(self, db: str, docid: str):
+        """
+        Forget the latest version of a document.
+
+        Specific revisions are kept, since they never change.
+        """
+        self._remove((db, docid))
+
+    def written(self, db: str, docid: str):
+        """
+        A document was (or might have been) changed through this client.
+        """
+        self.evict(db, docid)
+
+    def clear(self):
+        """
+        Forget everything.
+        """
+        self._entries.clear()
+        self._nbytes = 0
+
+    def stamp(self, db: str) -> int | None:
+        """
+        Marker to put in an entry that's about to be fetched, for
+        :meth:`is_current`.
+        """
+        return None
+
+    def is_current(self, db: str, docid: str, entry: CacheEntry) -> bool:
+        """
+        Can the entry be used without checking with the server?
+        """
+        return False
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._nbytes -= len(entry.raw)
+
+
+class _Feed:
+    def __init__(self, floor: int):
+        #: When we last knew about every change (monotonic)
+        self.caught_up = None
+        #: docid -> stamp of its latest change
+        self.changed = collections.OrderedDict()
+        #: Stamp of the latest change we've forgotten about
+        self.floor = floor
+
+
+class WatchedCache(DocumentCache):
+    """
+    A :class:`DocumentCache` that follows the changes feed of databases to
+    evict changed documents.
+
+    While the feed is no more than ``max_staleness`` seconds behind, documents
+    from watched databases are served without asking the server. Otherwise, it
+    falls back to revalidating. Writes made through sessions using the cache
+    take effect right away, without waiting for the feed.
+
+    Watch databases in a task group, like::
+
+        await tg.start(cache.watch, session["spam"])
+    """
+
+    #: Number of changes seen on the feeds
+    changes_seen: int
+
+    def __init__(self, *, max_staleness: float = 5.0, **kwargs):
+        super().__init__(**kwargs)
+        self.max_staleness = max_staleness
+        self.changes_seen = 0
+        self._stamp = 0
+        self._feeds = {}
+
+    def feed_lag(self, db: str) -> float | None:
+        """
+        How far behind (in seconds) the changes feed for a database might be, or
+        ``None`` if it's not being watched (or hasn't started).
+        """
+        feed = self._feeds.get(db)
+        if feed is None or feed.caught_up is None:
+            return None
+        return time.monotonic() - feed.caught_up
+
+    def stamp(self, db: str) -> int | None:
+        return self._stamp
+
+    def is_current(self, db: str, docid: str, entry: CacheEntry) -> bool:
+        lag = self.feed_lag(db)
+        if lag is None or lag > self.max_staleness or entry.stamp is None:
+            return False
+        feed = self._feeds[db]
+        # If it changed after we started fetching, the entry might be old
+        return entry.stamp >= feed.changed.get(docid, feed.floor)
+
+    def written(self, db: str, docid: str):
+        # Like a change on the feed, so that reads that were already under way
+        # don't put the old version back as current
+        if db in self._feeds:
+            self._invalidate(db, docid)
+        else:
+            self.evict(db, docid)
+
+    def _changed(self, db: str, docid: str):
+        self.changes_seen += 1
+        self._invalidate(db, docid)
+
+    def _invalidate(self, db: str, docid: str):
+        feed = self._feeds[db]
+        self._stamp += 1
+        feed.changed[docid] = self._stamp
+        feed.changed.move_to_end(docid)
+        while len(feed.changed) > self.max_entries:
+            _, feed.floor = feed.changed.popitem(last=False)
+        self.evict(db, docid)
+
+    async def watch(self, db, *, task_status=anyio.TASK_STATUS_IGNORED):
+        """
+        Follow the changes feed of the given :class:`~chaise.Database`.
+
+        Runs forever. Reports as started once it's caught up.
+        """
+        feed = self._feeds[db._name] = _Feed(self._stamp)
+        since = "now"
+        delay = 0.1
+        started = False
+        try:
+            while True:
+                asked = time.monotonic()
+                try:
+                    async with db._session._stream(
+                        "GET",
+                        db._name,
+                        "_changes",
+                        params={
+                            "feed": "normal" if since == "now" else "longpoll",
+                            "since": since,
+                            "timeout": int(self.max_staleness * 500),
+                        },
+                        headers={
+                            "Accept": "application/json",
+                        },
+                        timeout=httpx.Timeout(10.0, read=self.max_staleness + 10),
+                    ) as resp:
+                        async for row in db._iter_changes_rows(resp, "longpoll"):
+                            if "last_seq" in row:
+                                since = row["last_seq"]
+                            else:
+                                self._changed(db._name, row["id"])
+                except httpx.TransportError:
+                    await anyio.sleep(delay)
+                    delay = min(delay * 2, 30)
+                    continue
+                delay = 0.1
+                # Everything that happened before we asked has been seen
+                feed.caught_up = asked
+                if not started:
+                    # Anything fetched before the feed started has to be
+                    # revalidated
+                    self._stamp += 1
+                    feed.floor = self._stamp
+                    task_status.started()
+                    started = True
+        finally:
+            del self._feeds[db._name]
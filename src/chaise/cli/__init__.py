@@ -4,10 +4,12 @@ CouchDB management tool
 
 import argparse
 import anyio
+import importlib
 import logging
 import os
 
-from .. import Missing
+from .. import DocumentRegistry, Missing
+from ..dictful import BasicSession
 from .datafiles import find_dbs
 from .client import ConstantPool
 
@@ -29,6 +31,61 @@ async def apply(args):
             print(f"{db.name} exists")
 
 
+def _find_registry(spec: str) -> type[DocumentRegistry]:
+    """
+    Import a registry given as ``module:Name``, or the only one defined in
+    ``module``.
+    """
+    modname, _, name = spec.partition(":")
+    module = importlib.import_module(modname)
+    if name:
+        return getattr(module, name)
+    found = [
+        obj
+        for obj in vars(module).values()
+        if isinstance(obj, type)
+        and issubclass(obj, DocumentRegistry)
+        and obj.__module__ == module.__name__
+    ]
+    if len(found) != 1:
+        raise SystemExit(f"Couldn't pick a registry from {modname}, use {modname}:Name")
+    return found[0]
+
+
+async def migrate(args):
+    """
+    Save all the documents of a database that need migrating
+    """
+    registry = _find_registry(args.module)
+
+    class MigrateSession(BasicSession):
+        loader = registry
+
+    pool = ConstantPool(args.server)
+    pool.session_class = MigrateSession
+    session = await pool.session()
+    db = await session.get_db(args.db)
+
+    def report(stats):
+        print(
+            f"{stats.scanned} scanned, {stats.migrated}/{stats.found} migrated, "
+            f"{len(stats.conflicts)} conflicts, {len(stats.rejected)} rejected"
+        )
+
+    stats = await db.migrate_docs(
+        page_size=args.page_size,
+        concurrency=args.concurrency,
+        rate=args.rate,
+        checkpoint=args.checkpoint or None,
+        progress=report if args.verbose else None,
+    )
+    report(stats)
+    for docid in stats.conflicts:
+        print(f"Conflict: {docid}")
+    for docid in stats.rejected:
+        print(f"Rejected: {docid}")
+
+
 def _arg_parser():
     async def usage(args):
         parser.print_usage()
@@ -54,6 +111,25 @@ def _arg_parser():
     applyp.set_defaults(func=apply)
     applyp.add_argument("module")
 
+    migratep = subparsers.add_parser("migrate", help=migrate.__doc__)
+    migratep.set_defaults(func=migrate)
+    migratep.add_argument("module", help="Registry to use, as module or module:Name")
+    migratep.add_argument("db")
+    migratep.add_argument(
+        "--page-size", type=int, default=500, help="Documents per request"
+    )
+    migratep.add_argument(
+        "--concurrency", type=int, default=4, help="Maximum writes in flight"
+    )
+    migratep.add_argument(
+        "--rate", type=float, default=None, help="Maximum documents saved per second"
+    )
+    migratep.add_argument(
+        "--checkpoint",
+        default="chaise-migrate",
+        help="Local document to record progress in (empty to disable)",
+    )
+
     return parser
 
 
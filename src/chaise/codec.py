@@ -0,0 +1,265 @@
+"""
+JSON encoding and decoding, using the fastest library available.
+"""
+
+import json
+import math
+
+# Integers this long might not fit in 64 bits, which the fast libraries either
+# refuse or turn into floats. (Searching for runs of zeros after mapping every
+# digit to zero is much faster than a regex.)
+_DIGITS = bytes.maketrans(b"123456789", b"000000000")
+_BIG_INT = b"0" * 19
+# Translated a piece at a time, so large bodies aren't copied whole
+_CHUNK = 64 * 1024
+
+
+def _might_have_big_ints(data: bytes) -> bool:
+    overlap = len(_BIG_INT) - 1
+    for start in range(0, len(data), _CHUNK):
+        if _BIG_INT in data[start : start + _CHUNK + overlap].translate(_DIGITS):
+            return True
+    return False
+
+
+_isfinite = math.isfinite
+
+
+def _plain(obj, keys: tuple) -> bool:
+    """
+    Is this made of only the types that every codec encodes the same way as
+    the standard library?
+
+    The fast libraries also encode things the standard library refuses (like
+    UUIDs and enums), and turn NaN and infinity into ``null``. Anything
+    unusual, including subclasses, is left to the standard library. Dict keys
+    may be strings or ``keys``.
+    """
+    kind = type(obj)
+    if kind is str or kind is int or kind is bool or obj is None:
+        return True
+    elif kind is float:
+        return _isfinite(obj)
+    elif kind is dict:
+        for key, value in obj.items():
+            if type(key) is not str and type(key) not in keys:
+                return False
+            item = type(value)
+            if item is str or item is int or item is bool or value is None:
+                continue
+            elif not _plain(value, keys):
+                return False
+        return True
+    elif kind is list or kind is tuple:
+        for value in obj:
+            item = type(value)
+            if item is str or item is int or item is bool or value is None:
+                continue
+            elif not _plain(value, keys):
+                return False
+        return True
+    else:
+        return kind is RawJson
+
+
+_decoder = json.JSONDecoder()
+
+
+class RawJson:
+    """
+    A value that's already encoded, which the codecs include as-is.
+
+    Refers to ``source[start:end]``, so that the parts of a large document can
+    be kept without copying them out.
+    """
+
+    __slots__ = ("source", "start", "end")
+
+    def __init__(self, source: str, start: int = 0, end: int | None = None):
+        self.source = source
+        self.start = start
+        self.end = len(source) if end is None else end
+
+    def __str__(self):
+        return self.source[self.start : self.end]
+
+    def __repr__(self):
+        return f"<{type(self).__name__} {str(self)!r}>"
+
+    def __eq__(self, other):
+        if not isinstance(other, RawJson):
+            return NotImplemented
+        return str(self) == str(other)
+
+    def __json__(self):
+        # ujson includes the result of this as-is
+        return str(self)
+
+    def decode(self):
+        """
+        Decode the value.
+        """
+        return _decoder.raw_decode(self.source, self.start)[0]
+
+
+class _HasRaw(Exception):
+    pass
+
+
+def _no_raw(obj):
+    if isinstance(obj, RawJson):
+        raise _HasRaw
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+# Same output as json.dumps(), but stops at the first RawJson
+_encoder = json.JSONEncoder(default=_no_raw)
+
+
+def _encode_with_raw(obj) -> str:
+    """
+    Encode something containing :class:`RawJson` (slowly).
+    """
+    if isinstance(obj, RawJson):
+        return str(obj)
+    elif isinstance(obj, dict):
+        items = (
+            f"{_encoder.encode(key if isinstance(key, str) else _encoder.encode(key))}"
+            f": {_encode_with_raw(value)}"
+            for key, value in obj.items()
+        )
+        return "{" + ", ".join(items) + "}"
+    elif isinstance(obj, (list, tuple)):
+        return "[" + ", ".join(_encode_with_raw(item) for item in obj) + "]"
+    else:
+        return _encoder.encode(obj)
+
+
+class JsonCodec:
+    """
+    Uses the standard library :mod:`json`.
+
+    The other codecs produce the same values, only faster. Anything they can't
+    handle exactly the same (like huge integers) is passed on to this, so
+    errors are also the same.
+    """
+
+    #: Name of the library used
+    name = "json"
+
+    def dumps(self, obj) -> bytes:
+        """
+        Encode a value as JSON.
+
+        :class:`RawJson` values are included as they are.
+        """
+        try:
+            return _encoder.encode(obj).encode("utf-8")
+        except _HasRaw:
+            return _encode_with_raw(obj).encode("utf-8")
+
+    def loads(self, data: bytes | str):
+        """
+        Decode a JSON document.
+        """
+        return json.loads(data)
+
+
+class OrjsonCodec(JsonCodec):
+    """
+    Uses :mod:`orjson`.
+
+    Raises:
+        ImportError: orjson isn't installed, or is older than 3.9.14
+    """
+
+    name = "orjson"
+
+    def __init__(self):
+        import orjson
+
+        # Before orjson.Fragment, RawJson could only go through the (slow)
+        # standard library
+        if not hasattr(orjson, "Fragment"):
+            raise ImportError("orjson 3.9.14 or later is needed")
+        self._orjson = orjson
+        # Anything _plain() lets through is encoded the same as the standard
+        # library; these make the rest fail instead of changing
+        self._options = (
+            orjson.OPT_NON_STR_KEYS
+            | orjson.OPT_PASSTHROUGH_DATACLASS
+            | orjson.OPT_PASSTHROUGH_DATETIME
+        )
+
+    def _fragment(self, obj):
+        if isinstance(obj, RawJson):
+            return self._orjson.Fragment(str(obj))
+        raise TypeError
+
+    def dumps(self, obj) -> bytes:
+        # Keys like these are written the same way with OPT_NON_STR_KEYS
+        if not _plain(obj, (int, bool, type(None))):
+            return super().dumps(obj)
+        try:
+            return self._orjson.dumps(obj, default=self._fragment, option=self._options)
+        except TypeError:
+            return super().dumps(obj)
+
+    def loads(self, data: bytes | str):
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        if _might_have_big_ints(data):
+            return super().loads(data)
+        try:
+            return self._orjson.loads(data)
+        except ValueError:
+            return super().loads(data)
+
+
+class UjsonCodec(JsonCodec):
+    """
+    Uses :mod:`ujson`.
+
+    Raises:
+        ImportError: ujson isn't installed
+    """
+
+    name = "ujson"
+
+    def __init__(self):
+        import ujson
+
+        self._ujson = ujson
+
+    def dumps(self, obj) -> bytes:
+        # ujson writes non-string keys like True and None its own way
+        if not _plain(obj, ()):
+            return super().dumps(obj)
+        try:
+            return self._ujson.dumps(
+                obj, ensure_ascii=False, escape_forward_slashes=False
+            ).encode("utf-8")
+        except (TypeError, OverflowError):
+            return super().dumps(obj)
+
+    def loads(self, data: bytes | str):
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        if _might_have_big_ints(data):
+            return super().loads(data)
+        try:
+            return self._ujson.loads(data)
+        except ValueError:
+            return super().loads(data)
+
+
+def default_codec() -> JsonCodec:
+    """
+    The fastest codec available: orjson, then ujson, then the standard library.
+    """
+    for kind in (OrjsonCodec, UjsonCodec):
+        try:
+            return kind()
+        except ImportError:
+            pass
+    return JsonCodec()
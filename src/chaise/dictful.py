@@ -2,13 +2,17 @@
 A basic version of chaise that just uses enriched dictionaries as the documents.
 
 :class:`BasicLoader`, :class:`BasicSession`, and :class:`BasicPool` do not do
-any migration handling.
+any migration handling. :class:`LazyLoader`, :class:`LazySession`, and
+:class:`LazyPool` are the same, but only decode the parts of documents that are
+used.
 
 :class:`DictRegistry` should be paired with :class:`~chaise.CouchSession` and
 :class:`~chaise.SessionPool` if you want some basic document type handling.
 """
 
 from . import DocumentRegistry, CouchSession, SessionPool
+from ._lazy import LazyObject
+from .codec import RawJson
 
 
 class Document(dict):
@@ -47,35 +51,170 @@ class Document(dict):
         return f"<{type(self).__name__} {self.id!r}@{self.rev!r} {' '.join(f'{k}={v!r}' for k,v in self.items())}>"
 
 
+def _upgrading(name):
+    def method(self, *args, **kwargs):
+        self._upgrade()
+        return getattr(self, name)(*args, **kwargs)
+
+    method.__name__ = name
+    return method
+
+
+class LazyDocument(Document):
+    """
+    A :class:`Document` that keeps the JSON it was loaded from, and only
+    decodes fields when they're read.
+
+    Fields that are never read are saved exactly as they were loaded, without
+    being decoded or encoded again. The first change to the document turns it
+    into a plain :class:`Document` (decoding everything left).
+
+    Reading through the dictionary methods is fine, but code that reads the
+    storage directly (like ``dict.__getitem__(doc, key)``) sees
+    :class:`~chaise.codec.RawJson` for the fields that haven't been read yet.
+    """
+
+    def __getitem__(self, key):
+        value = dict.__getitem__(self, key)
+        if type(value) is RawJson:
+            value = value.decode()
+            dict.__setitem__(self, key, value)
+        return value
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+    def _decode_all(self):
+        for key, value in dict.items(self):
+            if type(value) is RawJson:
+                dict.__setitem__(self, key, value.decode())
+
+    def _upgrade(self):
+        self._decode_all()
+        self.__class__ = Document
+
+    # Not inheriting dict.__iter__ stops dict(doc), {**doc}, and dict.copy()
+    # from copying the storage as-is
+    def __iter__(self):
+        return dict.__iter__(self)
+
+    def values(self):
+        self._decode_all()
+        return dict.values(self)
+
+    def items(self):
+        self._decode_all()
+        return dict.items(self)
+
+    def copy(self):
+        self._decode_all()
+        return dict.copy(self)
+
+    def __eq__(self, other):
+        self._decode_all()
+        return dict.__eq__(self, other)
+
+    def __ne__(self, other):
+        self._decode_all()
+        return dict.__ne__(self, other)
+
+    def __or__(self, other):
+        self._decode_all()
+        return dict.__or__(self, other)
+
+    def __ror__(self, other):
+        self._decode_all()
+        return dict.__ror__(self, other)
+
+    __setitem__ = _upgrading("__setitem__")
+    __delitem__ = _upgrading("__delitem__")
+    __ior__ = _upgrading("__ior__")
+    clear = _upgrading("clear")
+    pop = _upgrading("pop")
+    popitem = _upgrading("popitem")
+    setdefault = _upgrading("setdefault")
+    update = _upgrading("update")
+
+
+# Underscore keys (besides _id and _rev) that become Document attributes
+_OPTIONAL_META = (
+    ("_deleted", "deleted"),
+    ("_attachments", "attachments"),
+    ("_conflicts", "conflicts"),
+    ("_deleted_conflicts", "deleted_conflicts"),
+    ("_local_seq", "local_seq"),
+    ("_revs_info", "revs_info"),
+    ("_revisions", "revisions"),
+)
+
+
 class BasicLoader:
     """
     Provides loading without worrying about types or migrations.
     """
 
     def loadj(self, blob: dict, _kind=Document) -> Document:
+        # Updating an empty dict from another copies the table in a single
+        # C-level operation, and the values aren't copied, so this is the only
+        # work proportional to the document size. Then only the metadata
+        # that's actually there gets moved out.
         doc = _kind()
-        doc.id = blob.pop("_id", None)
-        doc.rev = blob.pop("_rev", None)
-        doc.deleted = blob.pop("_deleted", False)
-        doc.attachments = blob.pop("_attachments", None)
-        doc.conflicts = blob.pop("_conflicts", None)
-        doc.deleted_conflicts = blob.pop("_deleted_conflicts", None)
-        doc.local_seq = blob.pop("_local_seq", None)
-        doc.revs_info = blob.pop("_revs_info", None)
-        doc.revisions = blob.pop("_revisions", None)
-        doc.update(blob)
+        dict.update(doc, blob)
+        doc.id = dict.pop(doc, "_id", None)
+        doc.rev = dict.pop(doc, "_rev", None)
+        for key, attr in _OPTIONAL_META:
+            if key in doc:
+                setattr(doc, attr, dict.pop(doc, key))
         return doc
 
+    def _fields(self, doc: Document) -> dict:
+        # Popping the metadata in loadj() leaves holes that make dict(doc) go
+        # key by key, while dict.copy() still copies the table wholesale
+        return dict.copy(doc)
+
     def dumpj(self, doc: Document) -> dict:
-        return (
-            doc
-            | ({"_id": doc.id} if doc.id is not None else {})
-            | ({"_rev": doc.rev} if doc.rev is not None else {})
-            | {
-                "_deleted": doc.deleted,
-                # The rest of it is informational not editable directly
-            }
-        )
+        blob = self._fields(doc)
+        if doc.id is not None:
+            blob["_id"] = doc.id
+        if doc.rev is not None:
+            blob["_rev"] = doc.rev
+        blob["_deleted"] = doc.deleted
+        # The rest of it is informational not editable directly
+        return blob
+
+    def set_revision(self, doc: Document, docid: str, rev: str):
+        doc.id = docid
+        doc.rev = rev
+
+
+class LazyLoader(BasicLoader):
+    """
+    Like :class:`BasicLoader`, but documents are loaded as
+    :class:`LazyDocument` when they can be.
+    """
+
+    lazy = True
+
+    def loadj(self, blob: dict, _kind=LazyDocument) -> Document:
+        if not isinstance(blob, LazyObject):
+            return super().loadj(blob)
+        # The documents are only indexed one level deep, so every member is
+        # still raw
+        doc = _kind()
+        dict.update(doc, blob.members)
+        doc.id = dict.pop(doc, "_id").decode() if "_id" in doc else None
+        doc.rev = dict.pop(doc, "_rev").decode() if "_rev" in doc else None
+        for key, attr in _OPTIONAL_META:
+            if key in doc:
+                setattr(doc, attr, dict.pop(doc, key).decode())
+        return doc
+
+    def _fields(self, doc: Document) -> dict:
+        if not isinstance(doc, LazyDocument):
+            return super()._fields(doc)
+        # Fields that haven't been read stay RawJson, so they're saved without
+        # encoding them again
+        return dict(dict.items(doc))
 
 
 class BasicSession(CouchSession):
@@ -86,6 +225,14 @@ class BasicPool(SessionPool):
     session_class = BasicSession
 
 
+class LazySession(CouchSession):
+    loader = LazyLoader
+
+
+class LazyPool(SessionPool):
+    session_class = LazySession
+
+
 class DictRegistry(DocumentRegistry):
     _loader = BasicLoader()
 
@@ -100,3 +247,9 @@ class DictRegistry(DocumentRegistry):
         Save a document
         """
         return self._loader.dumpj(doc)
+
+    def set_revision(self, doc: Document, docid: str, rev: str):
+        """
+        Update a saved document's ID and revision
+        """
+        self._loader.set_revision(doc, docid, rev)
@@ -2,7 +2,9 @@
 Extra bits to make your job easier.
 """
 
+import dataclasses
 import random
+import time
 from socket import AddressFamily, SocketKind
 
 
@@ -65,6 +67,148 @@ async def _get_ips(hostname: str | bytes, port: int | None = None):
                 continue
 
 
+@dataclasses.dataclass
+class _DnsEntry:
+    #: The addresses, or ``None`` if the lookup failed
+    ips: list[str] | None
+
+    #: Why the lookup failed
+    error: OSError | None
+
+    #: When it was last looked up successfully (monotonic)
+    resolved: float | None
+
+    #: When to look it up again (monotonic)
+    expires: float
+
+    #: When it was last asked for (monotonic)
+    used: float = 0.0
+
+
+# The least time between rounds of DnsCache.refresh(), however small
+# refresh_ahead is
+_MIN_REFRESH_INTERVAL = 1.0
+
+
+class DnsCache:
+    """
+    Remembers DNS lookups, so that :class:`DnsPoolMixin` doesn't ask the
+    resolver for every session.
+
+    Addresses are kept for ``ttl`` seconds, and failed lookups for
+    ``negative_ttl``. If a lookup fails when there's an older answer (up to
+    ``max_stale`` seconds past its ``ttl``), the older answer is used instead,
+    so that a resolver blip doesn't take everything offline.
+
+    To look things up again before they expire, instead of while a session
+    waits, run :meth:`refresh` in a task group::
+
+        await tg.start(pool.dns_cache.refresh)
+
+    Hostnames that haven't been asked for in ``ttl + max_stale`` seconds are
+    forgotten by :meth:`refresh`, rather than looked up forever.
+    """
+
+    #: Number of lookups answered from the cache
+    hits: int
+
+    #: Number of lookups that went to the resolver
+    misses: int
+
+    def __init__(
+        self,
+        *,
+        ttl: float = 30.0,
+        negative_ttl: float = 5.0,
+        max_stale: float = 300.0,
+        refresh_ahead: float = 5.0,
+    ):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_stale = max_stale
+        self.refresh_ahead = refresh_ahead
+        self.hits = 0
+        self.misses = 0
+        self._entries = {}
+        self._inflight = {}
+
+    async def resolve(
+        self, hostname: str | bytes, port: int | None = None
+    ) -> list[str]:
+        """
+        Look up the IPs for a given hostname.
+
+        Raises:
+            OSError: The lookup failed (recently), and there's no older answer
+        """
+        key = hostname, port
+        while True:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() < entry.expires:
+                self.hits += 1
+                break
+            elif (done := self._inflight.get(key)) is not None:
+                # Someone else is already asking
+                await done.wait()
+            else:
+                entry = await self._lookup(key)
+                break
+        entry.used = time.monotonic()
+        if entry.ips is None:
+            raise entry.error
+        return entry.ips
+
+    async def _lookup(self, key) -> _DnsEntry:
+        self.misses += 1
+        self._inflight[key] = done = anyio.Event()
+        try:
+            ips = [ip async for ip in _get_ips(*key)]
+        except OSError as exc:
+            now = time.monotonic()
+            entry = self._entries.get(key)
+            if (
+                entry is not None
+                and entry.ips is not None
+                and now - entry.resolved < self.ttl + self.max_stale
+            ):
+                # Keep using it, but don't hammer the resolver in the meantime
+                entry.expires = max(entry.expires, now + self.negative_ttl)
+            else:
+                entry = _DnsEntry(None, exc, None, now + self.negative_ttl)
+        else:
+            now = time.monotonic()
+            entry = _DnsEntry(ips, None, now, now + self.ttl)
+            if (old := self._entries.get(key)) is not None:
+                entry.used = old.used
+        finally:
+            del self._inflight[key]
+            done.set()
+        self._entries[key] = entry
+        return entry
+
+    async def refresh(self, *, task_status=anyio.TASK_STATUS_IGNORED):
+        """
+        Look up hostnames again when they're within ``refresh_ahead`` seconds
+        of expiring, and forget ones that aren't used anymore.
+
+        Runs forever.
+        """
+        task_status.started()
+        while True:
+            now = time.monotonic()
+            async with anyio.create_task_group() as tg:
+                for key, entry in list(self._entries.items()):
+                    if key in self._inflight:
+                        continue
+                    elif now - entry.used > self.ttl + self.max_stale:
+                        del self._entries[key]
+                    elif entry.ips is not None and (
+                        now >= entry.expires - self.refresh_ahead
+                    ):
+                        tg.start_soon(self._lookup, key)
+            await anyio.sleep(max(self.refresh_ahead / 2, _MIN_REFRESH_INTERVAL))
+
+
 class DnsPoolMixin(SessionPool):
     """
     Uses DNS round robin to find pool members.
@@ -74,13 +218,195 @@ class DnsPoolMixin(SessionPool):
 
     url: httpx.URL
 
+    #: Lookups of :attr:`url`, if they're cached
+    dns_cache: DnsCache | None
+
     def __init__(self, url: str):
         self.url = httpx.URL(url)
+        self.dns_cache = self.make_dns_cache()
         super().__init__()
 
+    def make_dns_cache(self) -> DnsCache | None:
+        """
+        Produce the cache of DNS lookups, or ``None`` to look up the hostname
+        for every session.
+
+        Override this to configure it, like::
+
+            def make_dns_cache(self):
+                return chaise.helpers.DnsCache(ttl=60)
+        """
+        return DnsCache()
+
     async def iter_servers(self):
-        # The domain stack already does our shuffling
-        async for ip in _get_ips(self.url.raw_host, self.url.port):
+        if self.dns_cache is None:
+            # The domain stack already does our shuffling
+            ips = [ip async for ip in _get_ips(self.url.raw_host, self.url.port)]
+        else:
+            ips = await self.dns_cache.resolve(self.url.raw_host, self.url.port)
+            ips = random.sample(ips, len(ips))
+        for ip in ips:
             if ":" in ip:
                 ip = f"[{ip}]"
             yield str(self.url.copy_with(host=ip))
+
+
+@dataclasses.dataclass
+class NodeHealth:
+    """
+    What :class:`MonitoredPoolMixin` knows about a server.
+    """
+
+    #: The server
+    url: str
+
+    #: Moving average of how long health checks take, in seconds (``None``
+    #: until one succeeds)
+    latency: float | None = None
+
+    #: Moving average of the fraction of health checks that fail
+    error_rate: float = 0.0
+
+    #: Did the last health check succeed?
+    up: bool = False
+
+    #: When the last health check finished (monotonic)
+    checked: float | None = None
+
+    def record(self, latency: float | None, alpha: float):
+        """
+        Fold in a health check that took ``latency`` seconds, or failed
+        (``None``).
+        """
+        self.checked = time.monotonic()
+        self.up = latency is not None
+        self.error_rate += alpha * ((0.0 if self.up else 1.0) - self.error_rate)
+        if self.up:
+            if self.latency is None:
+                self.latency = latency
+            else:
+                self.latency += alpha * (latency - self.latency)
+
+    @property
+    def score(self) -> float:
+        """
+        Expected cost of using this server (lower is better): the latency,
+        inflated by the chance of an error.
+        """
+        return self.latency / max(1.0 - self.error_rate, 0.1)
+
+
+class MonitoredPoolMixin(SessionPool):
+    """
+    A pool mixin that checks the health of servers in the background, so that
+    :meth:`session` can hand out the best one without asking it first.
+
+    Combine with something that finds servers, like::
+
+        class MyPool(MonitoredPoolMixin, DnsPoolMixin, BasicPool):
+            pass
+
+    And run the monitor in a task group::
+
+        await tg.start(pool.monitor)
+
+    Until the first round of checks is done (or if none of the servers are up),
+    :meth:`session` falls back to checking servers itself.
+    """
+
+    #: Seconds between rounds of health checks
+    check_interval: float = 5.0
+
+    #: Seconds before a health check counts as failed
+    check_timeout: float = 2.0
+
+    #: Weight of the newest health check in :attr:`NodeHealth.latency` and
+    #: :attr:`NodeHealth.error_rate`
+    ewma_alpha: float = 0.3
+
+    #: Servers that fail more often than this aren't handed out
+    max_error_rate: float = 0.5
+
+    #: What's known about each server, by URL
+    nodes: dict[str, NodeHealth]
+
+    def __init__(self, *args, **kwargs):
+        self.nodes = {}
+        super().__init__(*args, **kwargs)
+
+    async def _probe(self, node: NodeHealth):
+        start = time.perf_counter()
+        latency = None
+        with anyio.move_on_after(self.check_timeout):
+            try:
+                if await self._check_server(httpx.URL(node.url)):
+                    latency = time.perf_counter() - start
+            except Exception:
+                # However it went wrong, it's a failed check. (Letting it out
+                # would stop the monitor, and the task group it's in.)
+                pass
+        node.record(latency, self.ewma_alpha)
+
+    async def check_servers(self):
+        """
+        Do one round of health checks, on every server from
+        :meth:`~chaise.SessionPool.iter_servers`.
+
+        If the servers can't be listed (eg, DNS is down), the ones from the last
+        round are checked again.
+        """
+        try:
+            urls = [url async for url in self.iter_servers()]
+        except Exception:
+            urls = list(self.nodes)
+        # Servers that went away (eg, from DNS) are forgotten
+        self.nodes = {url: self.nodes.get(url) or NodeHealth(url) for url in urls}
+        async with anyio.create_task_group() as tg:
+            for node in self.nodes.values():
+                tg.start_soon(self._probe, node)
+
+    async def monitor(self, *, task_status=anyio.TASK_STATUS_IGNORED):
+        """
+        Check the servers every :attr:`check_interval` seconds.
+
+        Runs forever. Reports as started after the first round.
+        """
+        try:
+            await self.check_servers()
+            task_status.started()
+            while True:
+                await anyio.sleep(self.check_interval)
+                await self.check_servers()
+        finally:
+            self.nodes = {}
+
+    def best_server(self, exclude: str | None = None) -> str | None:
+        """
+        The healthy server with the lowest :attr:`NodeHealth.score`, if any.
+
+        Servers that sessions are avoiding (see
+        :attr:`~chaise.SessionPool.breaker_threshold`) don't count.
+        """
+        healthy = [
+            node
+            for node in self.nodes.values()
+            if node.up
+            and node.error_rate <= self.max_error_rate
+            and str(httpx.URL(node.url)) != exclude
+            and self._server_allowed(str(httpx.URL(node.url)))
+        ]
+        if not healthy:
+            return None
+        return min(healthy, key=lambda node: node.score).url
+
+    async def session(self):
+        url = self.best_server()
+        if url is None:
+            return await super().session()
+        return self._make_session(httpx.URL(url))
+
+    async def _failover_server(self, current: str) -> httpx.URL | None:
+        url = self.best_server(exclude=current)
+        if url is None:
+            return await super()._failover_server(current)
+        return httpx.URL(url)
@@ -34,3 +34,126 @@ class AllDocs_DocRef:
             # (It can still be deleted/vacuumed, but that's fine. probably.)
             self._doc = await self._db.get(self.docid, rev=self.rev)
         return self._doc
+
+
+@dataclasses.dataclass
+class Change:
+    """
+    A change returned by :meth:`~chaise.Database.iter_changes`
+    """
+
+    #: The sequence ID of the change
+    seq: str
+
+    #: The document ID
+    docid: str
+
+    #: The leaf revisions of the document
+    revs: list[str]
+
+    #: Was the document deleted?
+    deleted: bool
+
+    _db: "chaise.Database"
+    _doc: object | None
+
+    async def doc(self):
+        """
+        Actually get the document. Like :meth:`AllDocs_DocRef.doc`, caches it.
+
+        (Might be pre-loaded by the producing function.)
+        """
+        if self._doc is None:
+            self._doc = await self._db.get(self.docid, rev=self.revs[0])
+        return self._doc
+
+
+@dataclasses.dataclass
+class ViewRow:
+    """
+    A row returned by :meth:`~chaise.Database.query_view`
+    """
+
+    #: The key emitted by the view (or the group, for reduced rows)
+    key: object
+
+    #: The value emitted by the view (or the reduced value)
+    value: object
+
+    #: The ID of the document that emitted the row (``None`` for reduced rows)
+    docid: str | None
+
+    _db: "chaise.Database"
+    _doc: object | None
+
+    async def doc(self):
+        """
+        Get the document that emitted the row. Caches it.
+
+        (Might be pre-loaded by the producing function.)
+        """
+        if self._doc is None:
+            if self.docid is None:
+                raise ValueError("Reduced rows don't have a document")
+            self._doc = await self._db.get(self.docid)
+        return self._doc
+
+
+@dataclasses.dataclass
+class DocResult:
+    """
+    The result for a single document in a bulk operation, like
+    :meth:`~chaise.Database.bulk_put`.
+    """
+
+    #: The document ID
+    docid: str | None
+
+    #: The revision of the document, if known
+    rev: str | None
+
+    #: The document, if there is one
+    doc: object | None = None
+
+    #: What went wrong, if anything
+    error: Exception | None = None
+
+    @property
+    def ok(self) -> bool:
+        """
+        Did the operation succeed for this document?
+        """
+        return self.error is None
+
+    def unwrap(self):
+        """
+        Get the document, raising the error if there was one.
+        """
+        if self.error is not None:
+            raise self.error
+        return self.doc
+
+
+@dataclasses.dataclass
+class MigrationProgress:
+    """
+    Running totals of :meth:`~chaise.Database.migrate_docs`
+    """
+
+    #: Number of documents looked at
+    scanned: int = 0
+
+    #: Number of documents of old types
+    found: int = 0
+
+    #: Number of documents migrated and saved
+    migrated: int = 0
+
+    #: IDs of documents that changed while being migrated
+    conflicts: list[str] = dataclasses.field(default_factory=list)
+
+    #: IDs of documents the server refused to save
+    rejected: list[str] = dataclasses.field(default_factory=list)
+
+    #: Every document up to this ID has been handled
+    position: str | None = None
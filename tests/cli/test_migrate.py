@@ -0,0 +1,25 @@
+import pytest
+
+import chaise.dictful
+
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_migrate(cli, cli_session, generate_dbname):
+    dbname = generate_dbname()
+    db = await cli_session.create_db(dbname)
+    try:
+        await db.bulk_put(
+            [
+                (f"spam{i}", chaise.dictful.Document(type="Spam1", eggs="EGGS"))
+                for i in range(5)
+            ]
+        )
+        await cli("migrate", "demo_models", dbname, "--page-size", "2")
+
+        async for ref in db.iter_all_docs(include_docs=True):
+            doc = await ref.doc()
+            assert (doc["type"], doc["eggs"]) == ("Spam2", "eggs")
+    finally:
+        await cli_session.delete_db(dbname)
@@ -0,0 +1,24 @@
+"""
+Document types for the CLI tests.
+"""
+
+import chaise.dictful
+
+
+class DemoRegistry(chaise.dictful.DictRegistry):
+    TYPE_KEY = "type"
+
+
+@DemoRegistry.document("Spam1")
+class OldSpam(chaise.dictful.Document):
+    pass
+
+
+@DemoRegistry.document("Spam2")
+class Spam(chaise.dictful.Document):
+    pass
+
+
+@DemoRegistry.migration(OldSpam, Spam)
+def spam1_migration(old):
+    return Spam(eggs=old["eggs"].lower())
@@ -28,6 +28,28 @@ async def basic_database(basic_session, generate_dbname):
     await basic_session.delete_db(dbname)
 
 
+class LazyPool(chaise.helpers.ConstantPoolMixin, chaise.dictful.LazyPool):
+    pass
+
+
+@pytest.fixture
+def lazy_pool(couch_url):
+    return LazyPool(couch_url)
+
+
+@pytest.fixture
+async def lazy_session(lazy_pool):
+    return await lazy_pool.session()
+
+
+@pytest.fixture
+async def lazy_database(lazy_session, generate_dbname):
+    dbname = generate_dbname()
+    db = await lazy_session.create_db(dbname)
+    yield db
+    await lazy_session.delete_db(dbname)
+
+
 class DictRegistry(chaise.dictful.DictRegistry):
     pass
 
@@ -69,11 +91,28 @@ def dict_models():
     class Counter(chaise.dictful.Document):
         pass
 
+    @DictRegistry.document("Bar1")
+    class OldBar(chaise.dictful.Document):
+        pass
+
+    @DictRegistry.document("Bar2")
+    class Bar(chaise.dictful.Document):
+        pass
+
+    @DictRegistry.migration(OldBar, Bar)
+    def bar_migration(old):
+        # Unlike the Foos, this keeps the metadata
+        new = Bar(old)
+        new.id, new.rev = old.id, old.rev
+        return new
+
     return types.SimpleNamespace(
         Foo=Foo,
         AncientFoo=AncientFoo,
         OldFoo=OldFoo,
         Counter=Counter,
+        OldBar=OldBar,
+        Bar=Bar,
     )
 
 
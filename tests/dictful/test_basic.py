@@ -6,6 +6,8 @@ import anyio
 import pytest
 
 import chaise
+import chaise.cache
+import chaise.dictful
 from chaise.dictful import Document
 
 
@@ -122,3 +124,576 @@ async def test_all_docs_include(basic_database):
     assert ref.docid == "test"
     assert ref._doc is not None
     assert await ref.doc() == doc
+
+
+async def test_bulk_put(basic_database):
+    """
+    Test that we can write many docs at once, across several requests
+    """
+    docs = [(f"test{i}", Document(count=i)) for i in range(10)]
+    results = await basic_database.bulk_put(docs, max_docs=3)
+
+    assert [r.docid for r in results] == [f"test{i}" for i in range(10)]
+    assert all(r.ok for r in results)
+
+    doc = await basic_database.get("test5")
+    assert doc["count"] == 5
+
+    # Revisions were updated, so these don't conflict
+    for _, doc in docs:
+        doc["count"] += 1
+    results = await basic_database.bulk_put([doc for _, doc in docs])
+    assert all(r.ok for r in results)
+
+    doc = await basic_database.get("test5")
+    assert doc["count"] == 6
+
+    # The documents themselves know their ID and new revision
+    _, doc = docs[5]
+    assert (doc.id, doc.rev) == ("test5", results[5].rev)
+    doc["count"] += 1
+    await basic_database.attempt_put(doc)
+    assert (await basic_database.get("test5"))["count"] == 7
+
+    # Including new ones that CouchDB named
+    doc = Document(count=0)
+    (result,) = await basic_database.bulk_put([doc])
+    assert (doc.id, doc.rev) == (result.docid, result.rev)
+    await basic_database.attempt_put(doc)
+
+
+async def test_bulk_put_conflict(basic_database):
+    """
+    Test that conflicts are reported per document
+    """
+    await basic_database.attempt_put(Document(spam="eggs"), "test")
+
+    results = await basic_database.bulk_put(
+        [("test", Document(spam="foo")), ("other", Document(spam="bar"))]
+    )
+
+    assert isinstance(results[0].error, chaise.Conflict)
+    assert results[1].ok
+    with pytest.raises(chaise.Conflict):
+        results[0].unwrap()
+
+
+async def test_bulk_delete(basic_database):
+    """
+    Test that we can delete many docs at once
+    """
+    await basic_database.bulk_put([(f"test{i}", Document(count=i)) for i in range(5)])
+    docs = [await basic_database.get(f"test{i}") for i in range(5)]
+
+    results = await basic_database.bulk_delete(docs)
+    assert all(r.ok for r in results)
+
+    with pytest.raises(chaise.Missing):
+        await basic_database.get("test3")
+
+
+async def test_get_many(basic_database):
+    """
+    Test that we can get many docs at once, with per-doc errors
+    """
+    await basic_database.bulk_put([(f"test{i}", Document(count=i)) for i in range(10)])
+    await basic_database.attempt_delete(await basic_database.get("test3"))
+
+    results = await basic_database.get_many(
+        [f"test{i}" for i in range(10)] + ["nope"], max_docs=4
+    )
+
+    assert [r.docid for r in results] == [f"test{i}" for i in range(10)] + ["nope"]
+    assert results[5].ok
+    assert results[5].doc["count"] == 5
+    assert isinstance(results[3].error, chaise.Deleted)
+    assert isinstance(results[10].error, chaise.Missing)
+
+
+async def test_loader_reuse(basic_session, basic_database, monkeypatch):
+    """
+    Test that one loader is shared, and that batches go through it at once
+    """
+    made = []
+    batches = []
+
+    class CountingLoader(chaise.dictful.BasicLoader):
+        def __init__(self):
+            made.append(self)
+
+        def loadj_many(self, blobs):
+            batches.append(len(blobs))
+            return [self.loadj(blob) for blob in blobs]
+
+    monkeypatch.setattr(basic_session, "loader", CountingLoader)
+    await basic_database.bulk_put([(f"test{i}", Document(count=i)) for i in range(10)])
+    await basic_database.get("test0")
+    await basic_database.get_many([f"test{i}" for i in range(10)])
+    assert len(made) == 1
+    assert batches == [1, 10]
+
+    # Loaders with per-call state can opt out
+    monkeypatch.setattr(basic_session, "get_loader", lambda: CountingLoader())
+    await basic_database.get("test0")
+    await basic_database.get("test1")
+    assert len(made) == 3
+
+
+async def test_get_many_revs(basic_database):
+    """
+    Test that we can get specific revisions
+    """
+    doc = Document(spam="eggs")
+    await basic_database.attempt_put(doc, "test")
+    doc = await basic_database.get("test")
+    rev = doc.rev
+    doc["spam"] = "foo"
+    await basic_database.attempt_put(doc)
+
+    (result,) = await basic_database.get_many([("test", rev)])
+    assert result.rev == rev
+    assert result.unwrap()["spam"] == "eggs"
+
+
+async def test_batched_get(basic_session, basic_database, monkeypatch):
+    """
+    Test that concurrent gets are combined into one request
+    """
+    await basic_database.bulk_put([(f"test{i}", Document(count=i)) for i in range(5)])
+
+    requests = []
+    orig_request = basic_session._request
+
+    async def _request(method, *urlparts, **kwargs):
+        requests.append(urlparts)
+        return await orig_request(method, *urlparts, **kwargs)
+
+    monkeypatch.setattr(basic_session, "_request", _request)
+    monkeypatch.setattr(basic_session, "batch_window", 0.01)
+
+    results = {}
+
+    async def get(key, docid):
+        try:
+            results[key] = await basic_database.get(docid)
+        except chaise.Missing as exc:
+            results[key] = exc
+
+    async with anyio.create_task_group() as tg:
+        for i in range(5):
+            tg.start_soon(get, i, f"test{i}")
+        tg.start_soon(get, "dupe", "test1")
+        tg.start_soon(get, "nope", "nope")
+
+    assert requests == [(basic_database._name, "_bulk_get")]
+    assert results[3]["count"] == 3
+    assert results["dupe"] == results[1]
+    assert results["dupe"] is not results[1]
+    assert isinstance(results["nope"], chaise.Missing)
+
+    # Returned documents can be saved as usual
+    results[2]["count"] = 20
+    await basic_database.attempt_put(results[2])
+
+
+async def test_coalesced_get(basic_session, basic_database, monkeypatch):
+    """
+    Test that identical concurrent reads share a request
+    """
+    await basic_database.attempt_put(Document(spam="eggs"), "test")
+
+    sent = []
+    orig_send = basic_session._client.send
+
+    async def send(request, **kwargs):
+        sent.append(request.url.path)
+        await anyio.sleep(0.01)
+        return await orig_send(request, **kwargs)
+
+    monkeypatch.setattr(basic_session._client, "send", send)
+    monkeypatch.setattr(basic_session, "coalesce_reads", True)
+
+    docs = []
+
+    async def get():
+        docs.append(await basic_database.get("test"))
+
+    async with anyio.create_task_group() as tg:
+        for _ in range(5):
+            tg.start_soon(get)
+
+    assert sent == [f"/{basic_database._name}/test"]
+    assert len(docs) == 5
+    docs[0]["spam"] = "foo"
+    assert all(doc["spam"] == "eggs" for doc in docs[1:])
+
+
+async def test_cached_get(basic_session, basic_database, monkeypatch):
+    """
+    Test that the document cache revalidates and serves revisions
+    """
+    monkeypatch.setattr(basic_session, "cache", chaise.cache.DocumentCache())
+    cache = basic_session.cache
+
+    await basic_database.attempt_put(Document(spam="eggs"), "test")
+
+    doc = await basic_database.get("test")
+    assert (cache.hits, cache.misses) == (0, 1)
+
+    doc2 = await basic_database.get("test")
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert doc2 == doc
+    assert doc2 is not doc
+
+    rev = doc.rev
+    doc["spam"] = "foo"
+    await basic_database.attempt_put(doc)
+
+    doc = await basic_database.get("test")
+    assert (cache.hits, cache.misses) == (1, 2)
+    assert doc["spam"] == "foo"
+
+    # Old revisions come straight from the cache
+    await basic_database.get("test", rev=rev)
+    old = await basic_database.get("test", rev=rev)
+    assert (cache.hits, cache.misses) == (2, 3)
+    assert old["spam"] == "eggs"
+
+    async for ref in basic_database.iter_all_docs():
+        assert await ref.doc() == doc
+    assert (cache.hits, cache.misses) == (3, 3)
+
+
+async def test_changes(basic_database):
+    """
+    Test that we can list changes
+    """
+    await basic_database.bulk_put([(f"test{i}", Document(count=i)) for i in range(5)])
+    await basic_database.attempt_delete(await basic_database.get("test3"))
+
+    changes = {}
+    async for change in basic_database.iter_changes(include_docs=True):
+        changes[change.docid] = change
+
+    assert set(changes) == {f"test{i}" for i in range(5)}
+    assert changes["test3"].deleted
+    assert (await changes["test1"].doc())["count"] == 1
+
+
+async def test_changes_continuous(basic_database):
+    """
+    Test that we can wait for changes
+    """
+    changes = []
+
+    async def listen():
+        async for change in basic_database.iter_changes(feed="continuous", limit=3):
+            changes.append(change.docid)
+
+    async with anyio.create_task_group() as tg:
+        tg.start_soon(listen)
+        for i in range(3):
+            await anyio.sleep(0.05)
+            await basic_database.attempt_put(Document(count=i), f"test{i}")
+
+    assert changes == ["test0", "test1", "test2"]
+
+
+async def test_changes_checkpoint(basic_database):
+    """
+    Test that changes feeds can pick up where they left off
+    """
+    await basic_database.bulk_put([(f"test{i}", Document(count=i)) for i in range(5)])
+
+    first = set()
+    async for change in basic_database.iter_changes(
+        checkpoint="test", checkpoint_every=1, limit=2
+    ):
+        first.add(change.docid)
+
+    rest = set()
+    async for change in basic_database.iter_changes(checkpoint="test"):
+        rest.add(change.docid)
+    # Changes can be repeated, but not skipped
+    assert first | rest == {f"test{i}" for i in range(5)}
+
+    await basic_database.attempt_put(Document(count=5), "test5")
+    changes = []
+    async for change in basic_database.iter_changes(checkpoint="test"):
+        changes.append(change.docid)
+    assert changes == ["test5"]
+
+
+async def test_changes_selector(basic_database):
+    """
+    Test that changes can be filtered
+    """
+    await basic_database.bulk_put([(f"test{i}", Document(count=i)) for i in range(5)])
+
+    changes = set()
+    async for change in basic_database.iter_changes(selector={"count": {"$gt": 2}}):
+        changes.add(change.docid)
+
+    assert changes == {"test3", "test4"}
+
+
+async def test_watched_cache(basic_session, basic_database, monkeypatch):
+    """
+    Test that a watched cache serves from memory until the doc changes
+    """
+    cache = chaise.cache.WatchedCache(max_staleness=1)
+    monkeypatch.setattr(basic_session, "cache", cache)
+
+    await basic_database.attempt_put(Document(spam="eggs"), "test")
+
+    async with anyio.create_task_group() as tg:
+        await tg.start(cache.watch, basic_database)
+        assert cache.feed_lag(basic_database._name) < 1
+
+        await basic_database.get("test")
+        doc = await basic_database.get("test")
+        assert (cache.hits, cache.misses) == (1, 1)
+
+        doc["spam"] = "foo"
+        await basic_database.attempt_put(doc)
+        with anyio.fail_after(5):
+            while not cache.changes_seen:
+                await anyio.sleep(0.01)
+
+        doc = await basic_database.get("test")
+        assert doc["spam"] == "foo"
+        assert (cache.hits, cache.misses) == (1, 2)
+
+        tg.cancel_scope.cancel()
+
+    assert cache.feed_lag(basic_database._name) is None
+
+
+async def test_watched_cache_own_writes(basic_session, basic_database, monkeypatch):
+    """
+    Test that a watched cache doesn't wait for the feed to see our own writes
+    """
+    cache = chaise.cache.WatchedCache(max_staleness=60)
+    monkeypatch.setattr(basic_session, "cache", cache)
+    await basic_database.bulk_put([(f"test{i}", Document(count=0)) for i in range(3)])
+
+    async with anyio.create_task_group() as tg:
+        await tg.start(cache.watch, basic_database)
+        # As if the feed were slow
+        monkeypatch.setattr(cache, "_changed", lambda db, docid: None)
+        docs = [await basic_database.get(f"test{i}") for i in range(3)]
+        for doc in docs:
+            doc["count"] = 1
+
+        await basic_database.attempt_put(docs[0])
+        await basic_database.bulk_put(docs[1:2])
+        await basic_database.attempt_delete(docs[2])
+
+        assert (await basic_database.get("test0"))["count"] == 1
+        assert (await basic_database.get("test1"))["count"] == 1
+        with pytest.raises(chaise.Missing):
+            await basic_database.get("test2")
+        assert cache.changes_seen == 0
+
+        tg.cancel_scope.cancel()
+
+
+async def test_all_docs_range(basic_database):
+    """
+    Test that we can list a range of docs
+    """
+    await basic_database.bulk_put([(f"test{i}", Document(count=i)) for i in range(10)])
+
+    async def ids(**kwargs):
+        return [ref.docid async for ref in basic_database.iter_all_docs(**kwargs)]
+
+    assert await ids(startkey="test3", endkey="test5") == ["test3", "test4", "test5"]
+    assert await ids(startkey="test3", endkey="test5", inclusive_end=False) == [
+        "test3",
+        "test4",
+    ]
+    assert await ids(startkey="test5", endkey="test3", descending=True) == [
+        "test5",
+        "test4",
+        "test3",
+    ]
+    assert await ids(limit=2) == ["test0", "test1"]
+    assert await ids(keys=["test7", "nope", "test2"]) == ["test7", "test2"]
+
+
+@pytest.mark.parametrize("page_size", [1, 3, 10, 100])
+async def test_all_docs_paged(basic_database, page_size):
+    """
+    Test that paging through all docs covers everything once
+    """
+    await basic_database.bulk_put([(f"test{i}", Document(count=i)) for i in range(10)])
+
+    refs = [
+        ref
+        async for ref in basic_database.iter_all_docs(
+            include_docs=True, page_size=page_size
+        )
+    ]
+    assert [ref.docid for ref in refs] == sorted(f"test{i}" for i in range(10))
+    assert all(ref._doc is not None for ref in refs)
+
+    refs = [
+        ref
+        async for ref in basic_database.iter_all_docs(
+            startkey="test2", limit=5, page_size=page_size
+        )
+    ]
+    assert [ref.docid for ref in refs] == [f"test{i}" for i in range(2, 7)]
+
+    # The limit covers every chunk of keys, not each one
+    keys = [f"test{i}" for i in (9, 1, 5, 3, 7, 0)]
+    refs = [
+        ref
+        async for ref in basic_database.iter_all_docs(
+            keys=keys, limit=4, page_size=page_size
+        )
+    ]
+    assert [ref.docid for ref in refs] == keys[:4]
+
+
+async def test_query_view(basic_database):
+    """
+    Test querying a view, with and without reducing
+    """
+    await basic_database.attempt_put(
+        Document(
+            views={
+                "by_kind": {
+                    "map": "function (doc) { emit([doc.kind, doc.count], doc.count); }",
+                    "reduce": "_sum",
+                },
+            }
+        ),
+        "_design/test",
+    )
+    await basic_database.bulk_put(
+        [
+            (f"test{i}", Document(kind="odd" if i % 2 else "even", count=i))
+            for i in range(10)
+        ]
+    )
+
+    rows = [
+        row
+        async for row in basic_database.query_view(
+            "test", "by_kind", reduce=False, include_docs=True, page_size=3
+        )
+    ]
+    assert [row.docid for row in rows] == [
+        f"test{i}" for i in [0, 2, 4, 6, 8, 1, 3, 5, 7, 9]
+    ]
+    assert all(row._doc is not None for row in rows)
+    for row in rows:
+        assert (await row.doc())["count"] == row.value
+
+    rows = [
+        row
+        async for row in basic_database.query_view(
+            "test", "by_kind", reduce=False, keys=[["odd", 3], ["even", 4]]
+        )
+    ]
+    assert [(row.docid, row.key) for row in rows] == [
+        ("test3", ["odd", 3]),
+        ("test4", ["even", 4]),
+    ]
+
+    rows = [
+        (row.key, row.value)
+        async for row in basic_database.query_view("test", "by_kind", group_level=1)
+    ]
+    assert rows == [(["even"], 20), (["odd"], 25)]
+
+    rows = [row async for row in basic_database.query_view("test", "by_kind")]
+    assert [(row.key, row.value, row.docid) for row in rows] == [(None, 45, None)]
+    with pytest.raises(ValueError):
+        await rows[0].doc()
+
+
+async def test_find(basic_database):
+    """
+    Test that Mango searches page through all the results
+    """
+    await basic_database.bulk_put([(f"test{i}", Document(count=i)) for i in range(10)])
+
+    docs = [
+        doc async for doc in basic_database.find({"count": {"$gte": 3}}, page_size=2)
+    ]
+    assert sorted(doc["count"] for doc in docs) == list(range(3, 10))
+    assert all(isinstance(doc, Document) for doc in docs)
+
+    docs = [
+        doc
+        async for doc in basic_database.find(
+            {"count": {"$gte": 3}}, fields=["_id"], limit=5, page_size=2
+        )
+    ]
+    assert len(docs) == 5
+    assert set(docs[0]) == {"_id"}
+
+
+async def test_indexes(basic_database):
+    """
+    Test that we can make indexes and check that queries use them
+    """
+    plan = await basic_database.explain({"count": {"$gt": 3}})
+    assert plan["index"]["name"] == "_all_docs"
+
+    await basic_database.create_index(["count"], name="by-count")
+    assert "by-count" in {
+        index["name"] for index in await basic_database.list_indexes()
+    }
+
+    plan = await basic_database.explain({"count": {"$gt": 3}})
+    assert plan["index"]["name"] == "by-count"
+
+
+def test_loader_metadata():
+    """
+    Test that metadata is moved out of the body and put back on the way out.
+    """
+    loader = chaise.dictful.BasicLoader()
+    blob = {"_id": "test", "_rev": "1-abc", "_conflicts": ["1-def"], "spam": "eggs"}
+    doc = loader.loadj(dict(blob))
+
+    assert dict(doc) == {"spam": "eggs"}
+    assert (doc.id, doc.rev, doc.conflicts, doc.deleted) == (
+        "test",
+        "1-abc",
+        ["1-def"],
+        False,
+    )
+
+    doc["foo"] = "bar"
+    assert loader.dumpj(doc) == {
+        "spam": "eggs",
+        "foo": "bar",
+        "_id": "test",
+        "_rev": "1-abc",
+        "_deleted": False,
+    }
+    assert "_id" not in doc
+
+
+def test_loader_subclass():
+    """
+    Test that document classes with their own constructor still load.
+    """
+
+    class Owned(Document):
+        def __init__(self, *, owner=None):
+            super().__init__()
+            self.owner = owner
+
+    blob = {"_id": "test", "_rev": "1-abc", "spam": "eggs"}
+    doc = chaise.dictful.BasicLoader().loadj(blob, _kind=Owned)
+
+    assert isinstance(doc, Owned)
+    assert dict(doc) == {"spam": "eggs"}
+    assert (doc.id, doc.owner) == ("test", None)
+    # The blob is left alone
+    assert blob == {"_id": "test", "_rev": "1-abc", "spam": "eggs"}
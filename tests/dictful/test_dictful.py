@@ -2,6 +2,8 @@
 Tests for chaise.dictful.Basic* versions of things.
 """
 
+import functools
+
 import anyio
 import pytest
 
@@ -108,3 +110,116 @@ async def test_migration3(dict_database, dict_models):
     end = await dict_database.get("test")
     assert isinstance(end, dict_models.Foo)
     assert end["bar"] == "Spam"
+
+
+async def raw_types(db):
+    rows = [
+        row async for row in db._iter_rows("_all_docs", params={"include_docs": True})
+    ]
+    return {row["id"]: row["doc"][""] for row in rows}
+
+
+async def test_migrate_docs(dict_database, dict_models):
+    olds = [dict_models.AncientFoo, dict_models.OldFoo, dict_models.Foo]
+    await dict_database.bulk_put(
+        [(f"test{i:02}", olds[i % 3](bar="SPAM")) for i in range(20)]
+        + [("counter", dict_models.Counter(count=1))]
+    )
+
+    seen = []
+    stats = await dict_database.migrate_docs(
+        page_size=3, concurrency=2, progress=lambda stats: seen.append(stats.position)
+    )
+    assert (stats.scanned, stats.found, stats.migrated) == (21, 14, 14)
+    assert not stats.conflicts and not stats.rejected
+    assert seen[-1] == "test19"
+    assert set((await raw_types(dict_database)).values()) == {"Foo3", "Counter"}
+
+    doc = await dict_database.get("test00")
+    assert doc["bar"] == "Spam"
+
+    # The checkpoint is gone once finished
+    stats = await dict_database.migrate_docs(page_size=3)
+    assert (stats.scanned, stats.found) == (21, 0)
+
+
+async def test_migrate_docs_resume(dict_database, dict_models):
+    await dict_database.bulk_put(
+        [(f"test{i:02}", dict_models.OldFoo(bar="spam")) for i in range(10)]
+    )
+
+    class Stop(Exception):
+        pass
+
+    def interrupt(stats):
+        if stats.migrated >= 4:
+            raise Stop
+
+    with pytest.raises(ExceptionGroup):
+        await dict_database.migrate_docs(page_size=2, concurrency=1, progress=interrupt)
+
+    stats = await dict_database.migrate_docs(page_size=2)
+    assert stats.scanned < 10
+    assert stats.found == stats.migrated == stats.scanned
+    assert set((await raw_types(dict_database)).values()) == {"Foo3"}
+
+
+async def test_migrate_docs_rate(dict_database, dict_models):
+    await dict_database.bulk_put(
+        [(f"test{i:02}", dict_models.OldFoo(bar="spam")) for i in range(6)]
+    )
+
+    start = anyio.current_time()
+    stats = await dict_database.migrate_docs(page_size=2, rate=20)
+    assert stats.migrated == 6
+    # The first batch goes right away, the other two wait 0.1s each
+    assert anyio.current_time() - start >= 0.2
+
+
+async def test_write_back(dict_session, dict_database, dict_models):
+    await dict_database.bulk_put(
+        [(f"test{i}", dict_models.OldFoo(bar="spam")) for i in range(5)]
+    )
+
+    async with anyio.create_task_group() as tg:
+        await tg.start(functools.partial(dict_session.write_back, window=0.5))
+        docs = [await dict_database.get(f"test{i}") for i in range(3)]
+        # Changed before it can be written back, so that has to win
+        docs[0]["bar"] = "Eggs"
+        await dict_database.attempt_put(docs[0])
+        await anyio.sleep(1)
+        tg.cancel_scope.cancel()
+
+    assert dict_session.written_back == 2
+    assert dict_session.write_back_failures == 1
+    assert await raw_types(dict_database) == {
+        "test0": "Foo3",
+        "test1": "Foo3",
+        "test2": "Foo3",
+        "test3": "Foo2",
+        "test4": "Foo2",
+    }
+    assert (await dict_database.get("test0"))["bar"] == "Eggs"
+
+    # The documents that were read know about their new revision
+    docs[1]["bar"] = "Ham"
+    await dict_database.attempt_put(docs[1])
+
+
+async def test_write_back_keeps_rev(dict_session, dict_database, dict_models):
+    await dict_database.attempt_put(dict_models.OldBar(spam="eggs"), "test")
+
+    async with anyio.create_task_group() as tg:
+        await tg.start(functools.partial(dict_session.write_back, window=0.1))
+        doc = await dict_database.get("test")
+        old_rev = doc.rev
+        await anyio.sleep(0.5)
+        tg.cancel_scope.cancel()
+
+    assert dict_session.written_back == 1
+    assert (await raw_types(dict_database)) == {"test": "Bar2"}
+    # The revision the migration kept was updated along with the etag
+    assert doc.rev != old_rev
+    doc["spam"] = "ham"
+    await dict_database.attempt_put(doc)
+    assert (await dict_database.get("test"))["spam"] == "ham"
@@ -0,0 +1,86 @@
+"""
+Tests for chaise.dictful.Lazy* versions of things.
+"""
+
+import pytest
+
+import chaise.dictful
+from chaise.codec import RawJson
+from chaise.dictful import Document, LazyDocument
+
+
+pytestmark = pytest.mark.anyio
+
+
+BIG = {"spam": "eggs", "nested": {"list": [1, 2.5, None, "]}"], "ok": True}}
+
+
+async def test_get(lazy_database):
+    """
+    Test that documents are only decoded as they're read.
+    """
+    await lazy_database.attempt_put(Document(BIG), "test")
+
+    doc = await lazy_database.get("test")
+
+    assert isinstance(doc, LazyDocument)
+    assert doc.id == "test"
+    assert doc.rev.startswith("1-")
+    assert sorted(doc) == ["nested", "spam"]
+    assert isinstance(dict.__getitem__(doc, "nested"), RawJson)
+    assert doc["spam"] == "eggs"
+    assert isinstance(dict.__getitem__(doc, "nested"), RawJson)
+    assert doc == BIG
+    assert dict(doc) == BIG
+
+
+async def test_all_docs_include(lazy_database):
+    """
+    Test that included docs are lazy.
+    """
+    await lazy_database.bulk_put(
+        [(docid, Document(BIG, n=i)) for i, docid in enumerate("abc")]
+    )
+
+    docs = [await ref.doc() async for ref in lazy_database.iter_all_docs(True)]
+
+    assert [doc.id for doc in docs] == ["a", "b", "c"]
+    assert all(isinstance(doc, LazyDocument) for doc in docs)
+    assert [doc["n"] for doc in docs] == [0, 1, 2]
+    assert [dict(doc) for doc in docs] == [BIG | {"n": i} for i in range(3)]
+
+
+async def test_round_trip(lazy_database):
+    """
+    Test that unread fields are saved as they were, and changing the document
+    decodes it.
+    """
+    await lazy_database.attempt_put(Document(BIG), "test")
+    doc = await lazy_database.get("test")
+
+    blob = lazy_database._session.get_loader().dumpj(doc)
+    assert isinstance(blob["nested"], RawJson)
+    await lazy_database.attempt_put(doc)
+
+    doc = await lazy_database.get("test")
+    assert doc.rev.startswith("2-")
+    assert doc == BIG
+
+    doc = await lazy_database.get("test")
+    doc["spam"] = "ham"
+    assert type(doc) is Document
+    assert dict.__getitem__(doc, "nested") == BIG["nested"]
+    await lazy_database.attempt_put(doc)
+
+    assert await lazy_database.get("test") == BIG | {"spam": "ham"}
+
+
+def test_loader_plain_blobs():
+    """
+    Test that blobs that are already decoded load normally.
+    """
+    loader = chaise.dictful.LazyLoader()
+    doc = loader.loadj({"_id": "test", "_rev": "1-abc", "spam": "eggs"})
+
+    assert type(doc) is Document
+    assert (doc.id, doc.rev, dict(doc)) == ("test", "1-abc", {"spam": "eggs"})
@@ -1,3 +1,4 @@
+import gc
 import types
 
 import anyio
@@ -52,11 +53,16 @@ def attrs_models():
     class Counter:
         count: int
 
+    @AttrsRegistry.document("SlottedCounter", slots=True)
+    class SlottedCounter:
+        count: int
+
     return types.SimpleNamespace(
         Foo=Foo,
         AncientFoo=AncientFoo,
         OldFoo=OldFoo,
         Counter=Counter,
+        SlottedCounter=SlottedCounter,
     )
 
 
@@ -179,3 +185,87 @@ async def test_migration3(attrs_database, attrs_models):
     end = await attrs_database.get("test")
     assert isinstance(end, attrs_models.Foo)
     assert end.spam == "Spam"
+
+
+async def test_bulk_put(attrs_database, attrs_models):
+    """
+    Test that bulk writes track document metadata
+    """
+    docs = [attrs_models.Counter(count=i) for i in range(5)]
+    results = await attrs_database.bulk_put(
+        [(f"test{i}", doc) for i, doc in enumerate(docs)]
+    )
+    assert all(r.ok for r in results)
+
+    for doc in docs:
+        doc.count += 10
+    results = await attrs_database.bulk_put(docs)
+    assert all(r.ok for r in results)
+
+    doc = await attrs_database.get("test2")
+    assert doc.count == 12
+
+
+async def test_registry_converter():
+    """
+    Test that registries can have their own converter, and hooks are made
+    up front
+    """
+
+    class FastRegistry(chaise.attrs.AttrsRegistry):
+        TYPE_KEY = "type"
+        converter = chaise.attrs.make_converter(detailed_validation=False)
+
+    @FastRegistry.document("Point")
+    class Point:
+        x: int
+        y: int
+        tags: set[str]
+
+    assert Point in FastRegistry._structurers
+    assert Point not in AttrsRegistry._structurers
+
+    loader = FastRegistry()
+    blob = loader.dumpj(Point(x=1, y=2, tags={"a"}))
+    assert blob == {"type": "Point", "x": 1, "y": 2, "tags": ["a"]}
+    assert loader.loadj(blob) == Point(x=1, y=2, tags={"a"})
+
+    # Not collected into an exception group
+    with pytest.raises(ValueError):
+        loader.loadj({"type": "Point", "x": "spam", "y": 2, "tags": []})
+
+
+async def test_slotted(attrs_database, attrs_models):
+    """
+    Test that slotted documents have room for their metadata
+    """
+    # Only if asked for
+    assert hasattr(attrs_models.Counter(count=1), "__dict__")
+
+    await attrs_database.attempt_put(attrs_models.SlottedCounter(count=1), "test")
+    doc = await attrs_database.get("test")
+    assert not hasattr(doc, "__dict__")
+    assert id(doc) not in chaise._DocRef.table
+
+    doc.count += 1
+    await attrs_database.attempt_put(doc)
+    assert (await attrs_database.get("test")).count == 2
+
+
+async def test_side_metadata():
+    """
+    Test that metadata for documents without room for it lives as long as they
+    do
+    """
+
+    class Slotted:
+        __slots__ = ("__weakref__",)
+
+    doc = Slotted()
+    chaise.Database._attach(doc, "db", "spam", '"1-a"')
+    assert chaise.Database._metadata(doc) == ("db", "spam", '"1-a"')
+
+    key = id(doc)
+    del doc
+    gc.collect()
+    assert key not in chaise._DocRef.table
@@ -0,0 +1,65 @@
+"""
+Tests for chaise.cache
+"""
+
+from chaise.cache import CacheEntry, DocumentCache, WatchedCache
+
+
+def entry(rev, size=10):
+    return CacheEntry(rev=rev, etag=f'"{rev}"', raw=b"x" * size)
+
+
+def test_get_put():
+    cache = DocumentCache()
+    cache.put("db", "spam", entry("1-a"))
+
+    assert cache.get("db", "spam").rev == "1-a"
+    assert cache.get("db", "spam", "1-a").rev == "1-a"
+    assert cache.get("db", "spam", "2-b") is None
+    assert cache.get("db", "eggs") is None
+
+
+def test_pinned():
+    cache = DocumentCache()
+    cache.put("db", "spam", entry("1-a"), pinned=True)
+    cache.put("db", "spam", entry("2-b"))
+
+    assert cache.get("db", "spam").rev == "2-b"
+    assert cache.get("db", "spam", "1-a").rev == "1-a"
+
+    cache.evict("db", "spam")
+    assert cache.get("db", "spam") is None
+    assert cache.get("db", "spam", "1-a").rev == "1-a"
+
+
+def test_evict_entries():
+    cache = DocumentCache(max_entries=2)
+    cache.put("db", "a", entry("1-a"))
+    cache.put("db", "b", entry("1-b"))
+    cache.get("db", "a")
+    cache.put("db", "c", entry("1-c"))
+
+    assert len(cache) == 2
+    assert cache.get("db", "b") is None
+    assert cache.get("db", "a") is not None
+
+
+def test_evict_bytes():
+    cache = DocumentCache(max_bytes=25)
+    cache.put("db", "a", entry("1-a", 10))
+    cache.put("db", "b", entry("1-b", 10))
+    assert cache.nbytes == 20
+    cache.put("db", "a", entry("2-a", 10))
+    assert cache.nbytes == 20
+    cache.put("db", "c", entry("1-c", 10))
+
+    assert cache.nbytes == 20
+    assert cache.get("db", "b") is None
+
+
+def test_watched_not_watching():
+    cache = WatchedCache()
+    cache.put("db", "spam", entry("1-a"))
+
+    assert not cache.is_current("db", "spam", cache.get("db", "spam"))
+    assert cache.feed_lag("db") is None
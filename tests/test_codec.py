@@ -0,0 +1,133 @@
+"""
+Tests for chaise.codec
+"""
+
+import dataclasses
+import datetime
+import enum
+import json
+import sys
+import types
+import uuid
+
+import pytest
+
+from chaise.codec import JsonCodec, OrjsonCodec, RawJson, UjsonCodec, default_codec
+
+
+def available():
+    codecs = []
+    for kind in (JsonCodec, OrjsonCodec, UjsonCodec):
+        try:
+            codec = kind()
+        except ImportError:
+            continue
+        codecs.append(pytest.param(codec, id=codec.name))
+    return codecs
+
+
+PAYLOADS = [
+    {"_id": "spam", "_rev": "1-abc", "count": 3, "ratio": 0.1, "ok": True},
+    {"rows": [{"id": "a", "key": ["x", 1], "value": None}], "total_rows": 1},
+    {"unicode": "snö ☃ \U0001f600", "escapes": '"\\/\n\t\x00'},
+    {"big": 2**70, "negbig": -(2**64), "int64": 2**63 - 1, "float": 1e300},
+    {1: "int key", None: "null key"},
+    ["a", [], {}, [[1.5, -0.0]]],
+    "1234567890123456789012345",
+]
+
+
+@pytest.mark.parametrize("codec", available())
+@pytest.mark.parametrize("payload", PAYLOADS)
+def test_same_values(codec, payload):
+    expected = json.loads(json.dumps(payload))
+    assert json.loads(codec.dumps(payload)) == expected
+    assert codec.loads(json.dumps(payload)) == expected
+    assert codec.loads(json.dumps(payload).encode("utf-8")) == expected
+
+
+@pytest.mark.parametrize("codec", available())
+def test_same_errors(codec):
+    @dataclasses.dataclass
+    class Spam:
+        eggs: int
+
+    for obj in [object(), datetime.date.today(), Spam(1)]:
+        with pytest.raises(TypeError):
+            codec.dumps(obj)
+
+    with pytest.raises(json.JSONDecodeError):
+        codec.loads(b'{"spam": ')
+
+
+@pytest.mark.parametrize("codec", available())
+def test_raw(codec):
+    text = '{"list": [1, "]", {"a": null}], "big": 123456789012345678901234}'
+    raw = RawJson(text, 9, 30)
+    payload = {"spam": raw, "eggs": [raw, {"x": RawJson(text)}], "ham": 1}
+
+    assert json.loads(codec.dumps(payload)) == {
+        "spam": [1, "]", {"a": None}],
+        "eggs": [[1, "]", {"a": None}], {"x": json.loads(text)}],
+        "ham": 1,
+    }
+    # Included as-is
+    assert b'"x": {"list"' in JsonCodec().dumps(payload)
+    assert str(raw) == '[1, "]", {"a": null}]'
+    assert raw.decode() == [1, "]", {"a": None}]
+
+
+def test_stdlib_identical():
+    for payload in PAYLOADS:
+        assert JsonCodec().dumps(payload) == json.dumps(payload).encode("utf-8")
+
+
+class Colour(enum.Enum):
+    RED = 1
+
+
+class Size(enum.IntEnum):
+    BIG = 2
+
+
+class Name(str):
+    pass
+
+
+@pytest.mark.parametrize("codec", available())
+def test_same_as_stdlib(codec):
+    # Things the fast libraries would otherwise encode differently, or at all
+    for payload in [
+        {"x": float("nan"), "y": [float("inf"), -float("inf")]},
+        {"size": Size.BIG, "name": Name("spam")},
+        {True: 1, None: 2, 3: 4},
+        {Size.BIG: 1},
+    ]:
+        # (By repr, since NaN isn't equal to itself)
+        expected = repr(json.loads(JsonCodec().dumps(payload)))
+        assert repr(json.loads(codec.dumps(payload))) == expected
+
+    for payload in [uuid.uuid4(), {"id": uuid.uuid4()}, [Colour.RED], {Colour.RED: 1}]:
+        with pytest.raises(TypeError):
+            JsonCodec().dumps(payload)
+        with pytest.raises(TypeError):
+            codec.dumps(payload)
+
+
+def test_big_ints_across_chunks():
+    data = b"[" + b" " * (64 * 1024 - 10) + b"123456789012345678901234]"
+    for codec in available():
+        assert codec.values[0].loads(data) == [123456789012345678901234]
+
+
+def test_default():
+    names = [param.values[0].name for param in available()]
+    # The first fast one that works, if any
+    assert default_codec().name == (names[1:] or names)[0]
+
+
+def test_old_orjson(monkeypatch):
+    # Without orjson.Fragment, RawJson would always take the slow way
+    monkeypatch.setitem(sys.modules, "orjson", types.ModuleType("orjson"))
+    with pytest.raises(ImportError):
+        OrjsonCodec()
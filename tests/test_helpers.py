@@ -5,6 +5,7 @@ Tests for chaise.helpers
 from socket import AddressFamily, SocketKind
 
 import anyio
+import httpx
 import pytest
 
 import chaise
@@ -114,3 +115,196 @@ async def test_roundrobin(monkeypatch):
         "http://[2607:f8b0:4009:808::200e]:5984/",
         "http://[fdaa:a:d05:0:1::2]:5984/",
     }
+
+
+class MonitoredPool(
+    chaise.helpers.MonitoredPoolMixin, chaise.helpers.ConstantPoolMixin
+):
+    session_class = chaise.CouchSession
+    check_interval = 0.05
+
+
+@pytest.fixture
+def monitored_pool(monkeypatch):
+    pool = MonitoredPool(["http://down/", "http://slow/", "http://fast/"])
+    pool.delays = {"down": None, "slow": 0.05, "fast": 0.01}
+    pool.checks = []
+
+    async def check_server(url):
+        pool.checks.append(url.host)
+        if pool.delays[url.host] is None:
+            raise httpx.ConnectError("Connection refused")
+        await anyio.sleep(pool.delays[url.host])
+        return True
+
+    monkeypatch.setattr(pool, "_check_server", check_server)
+    return pool
+
+
+async def test_monitored(monitored_pool):
+    pool = monitored_pool
+    await pool.check_servers()
+
+    assert set(pool.nodes) == set(pool.urls)
+    assert not pool.nodes["http://down/"].up
+    assert pool.nodes["http://down/"].error_rate > 0
+    assert pool.nodes["http://fast/"].latency < pool.nodes["http://slow/"].latency
+
+    pool.checks.clear()
+    session = await pool.session()
+    assert session._root.host == "fast"
+    # Getting a session doesn't ask the server
+    assert pool.checks == []
+
+    pool.delays["fast"] = None
+    await pool.check_servers()
+    assert (await pool.session())._root.host == "slow"
+
+    # Servers that go away are forgotten
+    pool.urls.remove("http://down/")
+    await pool.check_servers()
+    assert set(pool.nodes) == {"http://slow/", "http://fast/"}
+
+
+async def test_monitored_errors(monitored_pool, monkeypatch):
+    pool = monitored_pool
+    await pool.check_servers()
+    before = dict(pool.nodes)
+
+    async def iter_servers():
+        raise OSError("Temporary failure in name resolution")
+        yield
+
+    monkeypatch.setattr(pool, "iter_servers", iter_servers)
+    # Servers that blow up in strange ways are just down
+    pool.delays["slow"] = "spam"
+    with anyio.move_on_after(0.3):
+        async with anyio.create_task_group() as tg:
+            await tg.start(pool.monitor)
+            await anyio.sleep(1)
+
+    # The monitor kept going, checking the servers it already knew about
+    assert pool.checks.count("fast") > 2
+    assert set(before) == set(pool.urls)
+    assert not before["http://slow/"].up
+
+
+async def test_monitored_background(monitored_pool):
+    pool = monitored_pool
+    with anyio.move_on_after(0.3):
+        async with anyio.create_task_group() as tg:
+            await tg.start(pool.monitor)
+            assert pool.best_server() == "http://fast/"
+            await anyio.sleep(1)
+
+    # A few rounds ran, and they're forgotten once it stops
+    assert pool.checks.count("fast") > 2
+    assert pool.nodes == {}
+    assert pool.best_server() is None
+
+
+@pytest.fixture
+def resolver(monkeypatch):
+    class Resolver:
+        calls = 0
+        error = None
+        delay = 0
+
+    async def getaddrinfo(host, port):
+        Resolver.calls += 1
+        await anyio.sleep(Resolver.delay)
+        if Resolver.error is not None:
+            raise Resolver.error
+        return [
+            (AddressFamily.AF_INET, SocketKind.SOCK_STREAM, 6, "", ("10.0.0.1", 0)),
+            (AddressFamily.AF_INET, SocketKind.SOCK_STREAM, 6, "", ("10.0.0.2", 0)),
+        ]
+
+    monkeypatch.setattr(anyio, "getaddrinfo", getaddrinfo)
+    return Resolver
+
+
+async def test_dns_cache(resolver):
+    pool = chaise.helpers.DnsPoolMixin("http://couch.db:5984/")
+
+    for _ in range(3):
+        servers = {s async for s in pool.iter_servers()}
+        assert servers == {"http://10.0.0.1:5984/", "http://10.0.0.2:5984/"}
+
+    assert resolver.calls == 1
+    assert (pool.dns_cache.hits, pool.dns_cache.misses) == (2, 1)
+
+
+async def test_dns_cache_concurrent(resolver):
+    cache = chaise.helpers.DnsCache()
+    resolver.delay = 0.05
+
+    async with anyio.create_task_group() as tg:
+        for _ in range(5):
+            tg.start_soon(cache.resolve, "couch.db", 5984)
+
+    assert resolver.calls == 1
+
+
+async def test_dns_cache_negative(resolver):
+    cache = chaise.helpers.DnsCache()
+    resolver.error = OSError("Name or service not known")
+
+    for _ in range(2):
+        with pytest.raises(OSError):
+            await cache.resolve("couch.db", 5984)
+
+    assert resolver.calls == 1
+
+
+async def test_dns_cache_stale(resolver):
+    cache = chaise.helpers.DnsCache(ttl=0)
+    ips = await cache.resolve("couch.db", 5984)
+
+    # The old answer is used while the resolver is down...
+    resolver.error = OSError("Temporary failure in name resolution")
+    assert await cache.resolve("couch.db", 5984) == ips
+    # ...without asking it every time
+    assert await cache.resolve("couch.db", 5984) == ips
+    assert resolver.calls == 2
+
+    # But not forever
+    cache = chaise.helpers.DnsCache(ttl=0, max_stale=0)
+    resolver.error = None
+    await cache.resolve("couch.db", 5984)
+    resolver.error = OSError("Temporary failure in name resolution")
+    with pytest.raises(OSError):
+        await cache.resolve("couch.db", 5984)
+
+
+async def test_dns_cache_refresh(resolver):
+    cache = chaise.helpers.DnsCache(ttl=10, refresh_ahead=10)
+    await cache.resolve("couch.db", 5984)
+
+    async with anyio.create_task_group() as tg:
+        await tg.start(cache.refresh)
+        await anyio.sleep(0.05)
+        tg.cancel_scope.cancel()
+
+    # It was looked up again in the background
+    assert resolver.calls == 2
+    await cache.resolve("couch.db", 5984)
+    assert resolver.calls == 2
+
+
+async def test_dns_cache_refresh_bounded(resolver):
+    cache = chaise.helpers.DnsCache(ttl=0, refresh_ahead=0)
+    await cache.resolve("couch.db", 5984)
+    await cache.resolve("unused.db", 5984)
+    # Last asked for longer ago than ttl + max_stale
+    cache._entries["unused.db", 5984].used -= cache.max_stale + 1
+
+    async with anyio.create_task_group() as tg:
+        await tg.start(cache.refresh)
+        await anyio.sleep(0.05)
+        tg.cancel_scope.cancel()
+
+    # Always due, but looked up once per round rather than in a busy loop
+    assert resolver.calls == 3
+    # Hostnames nobody asks for anymore are forgotten, not looked up again
+    assert list(cache._entries) == [("couch.db", 5984)]
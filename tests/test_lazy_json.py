@@ -0,0 +1,60 @@
+"""
+Tests for finding the parts of JSON without decoding it
+"""
+
+import json
+
+import pytest
+
+from chaise._lazy import LazyObject, skip
+
+
+DOC = """{ "_id" : "spam",
+  "s": "a\\\\\\"b]}",
+  "n": -1.5e3, "t": true, "z": null,
+  "list": [1, [2, "]"], {"}": "{"}],
+  "obj": {"a": {"b": [{}]}},
+  "empty": {}, "esc\\u00e9": "x"
+}"""
+
+
+def test_skip():
+    for value in json.loads(DOC).values():
+        text = json.dumps(value) + ","
+        assert skip(text, 0) == len(text) - 1
+    # Dense containers are left to the decoder
+    text = json.dumps([{"a": "b"}] * 1000) + "]"
+    assert skip(text, 0) == len(text) - 1
+
+
+@pytest.mark.parametrize(
+    "text", ['"abc', '"abc\\"', "[1, [2]", '{"a": "}"', '{"a": 1', "123", "tru"]
+)
+def test_skip_truncated(text):
+    assert skip(text, 0) is None
+
+
+def test_object():
+    obj = LazyObject(DOC)
+
+    assert dict(obj) | {"obj": None} == json.loads(DOC) | {"obj": None}
+    assert list(obj) == list(json.loads(DOC))
+    assert isinstance(obj["obj"], LazyObject)
+    assert obj["obj"]["a"]["b"] == [{}]
+    assert str(obj.members["list"]) == '[1, [2, "]"], {"}": "{"}]'
+    assert obj.raw.end == len(DOC)
+
+
+@pytest.mark.parametrize("text", ["[]", '{"a" 1}', '{"a": 1 "b": 2}', '{"a": [}'])
+def test_object_invalid(text):
+    with pytest.raises(json.JSONDecodeError):
+        LazyObject(text)
+
+
+def test_moved():
+    text = '[{"a": {"b": 1}, "c": "d"}]'
+    obj = LazyObject(text, 1, depth=2).moved(text[1:-1], 1)
+
+    assert obj.raw.source == text[1:-1]
+    assert obj["a"]["b"] == 1
+    assert obj["c"] == "d"
@@ -0,0 +1,81 @@
+"""
+Tests for the type handling in chaise.DocumentRegistry
+"""
+
+import pytest
+
+import chaise.dictful
+
+
+def make_registry():
+    class Registry(chaise.dictful.DictRegistry):
+        TYPE_KEY = "type"
+
+    @Registry.document("A")
+    class A(chaise.dictful.Document):
+        pass
+
+    @Registry.document("B")
+    class B(chaise.dictful.Document):
+        pass
+
+    @Registry.document("C")
+    class C(chaise.dictful.Document):
+        pass
+
+    return Registry, A, B, C
+
+
+def test_names():
+    Registry, A, B, C = make_registry()
+
+    class SubA(A):
+        pass
+
+    assert Registry._get_name_from_class(A) == "A"
+    assert Registry._get_name_from_class(SubA) == "A"
+    with pytest.raises(ValueError):
+        Registry._get_name_from_class(chaise.dictful.Document)
+
+
+def test_separate_registries():
+    Registry1, A1, _, _ = make_registry()
+    Registry2, A2, _, _ = make_registry()
+
+    assert Registry1._get_class_from_name("A") is A1
+    assert Registry2._get_class_from_name("A") is A2
+
+
+def test_migration_chain():
+    Registry, A, B, C = make_registry()
+
+    @Registry.migration(A, B)
+    def a2b(doc):
+        return B(steps=doc["steps"] + ["a2b"])
+
+    @Registry.migration(B, C)
+    def b2c(doc):
+        return C(steps=doc["steps"] + ["b2c"])
+
+    doc = Registry().loadj({"type": "A", "steps": []})
+    assert type(doc) is C
+    assert doc["steps"] == ["a2b", "b2c"]
+
+    doc = Registry().loadj({"type": "C", "steps": []})
+    assert doc["steps"] == []
+
+
+def test_migration_validation():
+    Registry, A, B, C = make_registry()
+
+    Registry.migration(A, B)(lambda doc: doc)
+    Registry.migration(B, C)(lambda doc: doc)
+
+    # Branching
+    with pytest.raises(ValueError):
+        Registry.migration(A, C)
+    # Loops
+    with pytest.raises(ValueError):
+        Registry.migration(C, A)
+    with pytest.raises(ValueError):
+        Registry.migration(C, C)
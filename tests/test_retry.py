@@ -0,0 +1,279 @@
+"""
+Tests for retrying and hedging requests on other servers
+"""
+
+import anyio
+import httpx
+import pytest
+
+import chaise
+import chaise.helpers
+from chaise.dictful import BasicSession
+
+
+pytestmark = pytest.mark.anyio
+
+UP = "http://up.test:5984/"
+DOWN = "http://down.test:5984/"
+
+
+class RetrySession(BasicSession):
+    retry_backoff = 0
+
+
+class MockPool(chaise.helpers.ConstantPoolMixin, chaise.SessionPool):
+    session_class = RetrySession
+
+    def __init__(self, handler):
+        self.handler = handler
+        self.requests = []
+        super().__init__([UP, DOWN])
+
+    def make_client(self):
+        def handler(request):
+            self.requests.append((request.method, request.url.host))
+            return self.handler(request)
+
+        return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+def down(request):
+    if request.url.host == "down.test":
+        raise httpx.ConnectError("Connection refused", request=request)
+    return httpx.Response(200, json={"ok": True})
+
+
+def unavailable(request):
+    if request.url.host == "down.test":
+        return httpx.Response(503, json={"error": "unavailable"})
+    return httpx.Response(200, json={"ok": True})
+
+
+async def test_failover():
+    pool = MockPool(down)
+    session = pool._make_session(httpx.URL(DOWN))
+
+    await session.get_db("spam")
+
+    assert pool.requests == [("HEAD", "down.test"), ("HEAD", "up.test")]
+    # It stays on the server that worked
+    await session.get_db("spam")
+    assert pool.requests[-1] == ("HEAD", "up.test")
+
+
+async def test_status_failover():
+    pool = MockPool(unavailable)
+    session = pool._make_session(httpx.URL(DOWN))
+
+    await session.get_db("spam")
+
+    assert pool.requests == [("HEAD", "down.test"), ("HEAD", "up.test")]
+
+
+async def test_unsafe_not_retried():
+    pool = MockPool(unavailable)
+    session = pool._make_session(httpx.URL(DOWN))
+
+    with pytest.raises(httpx.HTTPStatusError):
+        await session["spam"].create_index(["eggs"])
+
+    assert pool.requests == [("POST", "down.test")]
+
+
+async def test_unsent_retried():
+    pool = MockPool(down)
+    session = pool._make_session(httpx.URL(DOWN))
+
+    await session["spam"].create_index(["eggs"])
+
+    assert pool.requests == [("POST", "down.test"), ("POST", "up.test")]
+
+
+async def test_budget():
+    pool = MockPool(down)
+    pool._retry_budget.tokens = 0
+    session = pool._make_session(httpx.URL(DOWN))
+
+    with pytest.raises(httpx.ConnectError):
+        await session.get_db("spam")
+
+    assert pool.requests == [("HEAD", "down.test")]
+
+
+async def test_no_pool():
+    pool = MockPool(down)
+    session = RetrySession(pool._client, httpx.URL(DOWN))
+
+    with pytest.raises(httpx.ConnectError):
+        await session.get_db("spam")
+
+    assert pool.requests == [("HEAD", "down.test")]
+
+
+async def test_breaker():
+    pool = MockPool(down)
+    pool.breaker_threshold = 2
+    for _ in range(2):
+        session = pool._make_session(httpx.URL(DOWN))
+        await session.get_db("spam")
+    assert not pool._server_allowed(DOWN)
+
+    # New sessions on the broken server skip it without asking
+    pool.requests.clear()
+    session = pool._make_session(httpx.URL(DOWN))
+    await session.get_db("spam")
+    assert pool.requests == [("HEAD", "up.test")]
+
+    # Until the cooldown's over
+    pool._breakers[DOWN].opened -= pool.breaker_cooldown
+    assert pool._server_allowed(DOWN)
+
+
+class HedgePool(MockPool):
+    hedge_percentile = 0.9
+
+    def __init__(self, handler):
+        super().__init__(handler)
+        self.cancelled = []
+        # Reads usually take about 10ms
+        for _ in range(20):
+            self._read_finished(0.01)
+
+
+def slow(down, up=0):
+    async def handler(request):
+        try:
+            await anyio.sleep(down if request.url.host == "down.test" else up)
+        except anyio.get_cancelled_exc_class():
+            pool.cancelled.append(request.url.host)
+            raise
+        return httpx.Response(200, json={"ok": True})
+
+    pool = HedgePool(handler)
+    return pool
+
+
+async def test_hedge():
+    pool = slow(10)
+    session = pool._make_session(httpx.URL(DOWN))
+
+    with anyio.fail_after(5):
+        await session.get_db("spam")
+
+    assert pool.requests == [("HEAD", "down.test"), ("HEAD", "up.test")]
+    assert pool.cancelled == ["down.test"]
+    assert (pool.hedgeable, pool.hedged, pool.hedge_wins) == (1, 1, 1)
+    assert pool.hedge_rate == 1.0
+    # It stays on the server that answered
+    assert str(session._root) == UP
+
+
+async def test_hedge_lost():
+    pool = slow(0.05, up=10)
+    session = pool._make_session(httpx.URL(DOWN))
+
+    with anyio.fail_after(5):
+        await session.get_db("spam")
+
+    assert pool.cancelled == ["up.test"]
+    assert (pool.hedgeable, pool.hedged, pool.hedge_wins) == (1, 1, 0)
+    assert str(session._root) == DOWN
+
+
+async def test_hedge_fast():
+    pool = slow(0)
+    session = pool._make_session(httpx.URL(UP))
+
+    await session.get_db("spam")
+    await session["spam"].create_index(["eggs"])
+
+    assert pool.requests == [("HEAD", "up.test"), ("POST", "up.test")]
+    assert (pool.hedgeable, pool.hedged) == (1, 0)
+
+
+async def test_hedge_budget():
+    pool = slow(0.05)
+    pool._hedge_budget.tokens = 0
+    session = pool._make_session(httpx.URL(DOWN))
+
+    await session.get_db("spam")
+
+    assert pool.requests == [("HEAD", "down.test")]
+    assert (pool.hedgeable, pool.hedged) == (1, 0)
+
+
+async def test_hedge_late(monkeypatch):
+    pool = slow(0.05)
+    tokens = pool._hedge_budget.tokens
+    failover_server = pool._failover_server
+
+    async def slow_failover_server(current):
+        await anyio.sleep(0.2)
+        return await failover_server(current)
+
+    monkeypatch.setattr(pool, "_failover_server", slow_failover_server)
+    session = pool._make_session(httpx.URL(DOWN))
+
+    await session.get_db("spam")
+
+    # The original answered while looking for another server, so no hedge
+    assert pool.requests == [("HEAD", "down.test")]
+    assert (pool.hedgeable, pool.hedged) == (1, 0)
+    assert pool._hedge_budget.tokens == tokens
+
+
+async def test_hedge_delay():
+    pool = HedgePool(down)
+    assert pool._hedge_after == 0.01
+
+    pool = MockPool(down)
+    pool.hedge_percentile = 0.5
+    session = pool._make_session(httpx.URL(UP))
+    for _ in range(19):
+        await session.get_db("spam")
+    assert pool._hedge_after is None
+    await session.get_db("spam")
+    assert pool._hedge_after == pool.hedge_min_delay
+
+
+async def test_changes_reconnect():
+    def changes(request):
+        since = request.url.params["since"]
+        if len(pool.requests) == 2:
+            return httpx.Response(503, json={"error": "unavailable"})
+        seq = str(int(since) + 1)
+        return httpx.Response(
+            200,
+            json={
+                "results": [
+                    {"seq": seq, "id": f"doc{seq}", "changes": [{"rev": "1-a"}]}
+                ],
+                "last_seq": seq,
+            },
+        )
+
+    pool = MockPool(changes)
+    timeouts = []
+    send = pool._client.send
+
+    async def record(request, **kwargs):
+        timeouts.append(request.extensions["timeout"]["read"])
+        return await send(request, **kwargs)
+
+    pool._client.send = record
+    # Not from the pool, so it's the feed that retries rather than the request
+    db = RetrySession(pool._client, httpx.URL(UP))["spam"]
+
+    with anyio.fail_after(5):
+        changes = [
+            change.docid
+            async for change in db.iter_changes("0", feed="longpoll", limit=2)
+        ]
+
+    assert changes == ["doc1", "doc2"]
+    assert len(pool.requests) == 3
+    assert None not in timeouts
+
+    # Listing the changes so far doesn't wait on the server forever, either
+    assert [change.docid async for change in db.iter_changes("5")] == ["doc6"]
+    assert timeouts[-1] == pool._client.timeout.read
@@ -0,0 +1,96 @@
+"""
+Tests for the incremental JSON parsing
+"""
+
+import json
+
+import pytest
+
+from chaise._streaming import iter_rows
+
+
+pytestmark = pytest.mark.anyio
+
+
+async def chunked(text, size):
+    for i in range(0, len(text), size):
+        yield text[i : i + size]
+
+
+async def collect(text, size, **kwargs):
+    return [row async for row in iter_rows(chunked(text, size), **kwargs)]
+
+
+ALL_DOCS = """{"total_rows":3,"offset":0,"rows":[\r
+{"id":"a","key":"a","value":{"rev":"1-x"},"doc":{"_id":"a","n":12345,"s":"],}\\"{"}},\r
+{"id":"b","key":"b","value":{"rev":"1-y"}},\r
+{"id":"c","key":"c","value":{"rev":"1-z"},"doc":{"_id":"c","n":[1.5,true,null]}}\r
+]}
+"""
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 50, 10_000])
+async def test_rows(size):
+    meta = {}
+    rows = await collect(ALL_DOCS, size, meta=meta)
+
+    assert rows == json.loads(ALL_DOCS)["rows"]
+    assert meta == {"total_rows": 3, "offset": 0}
+
+
+@pytest.mark.parametrize("size", [1, 4, 10_000])
+async def test_trailing_meta(size):
+    text = '{"results":[\n{"seq":"1-x","id":"a"},\n{"seq":"2-x","id":"b"}\n],\n"last_seq":"2-x","pending":0}\n'
+    meta = {}
+    rows = await collect(text, size, key="results", meta=meta)
+
+    assert [row["id"] for row in rows] == ["a", "b"]
+    assert meta == {"last_seq": "2-x", "pending": 0}
+
+
+@pytest.mark.parametrize("size", [1, 3, 10_000])
+async def test_top_level(size):
+    assert await collect('["_users", "spam", "eggs"]', size, key=None) == [
+        "_users",
+        "spam",
+        "eggs",
+    ]
+    assert await collect("[]", size, key=None) == []
+    assert await collect('{"rows": []}', size) == []
+
+
+async def test_numbers():
+    # Numbers at the end of a chunk must not be cut short
+    assert await collect("[123456, 7]", 3, key=None) == [123456, 7]
+
+
+async def test_invalid():
+    with pytest.raises(ValueError):
+        await collect('{"rows": [1, 2}', 1)
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 50, 10_000])
+async def test_lazy_rows(size):
+    meta = {}
+    rows = await collect(ALL_DOCS, size, meta=meta, lazy=2)
+
+    assert [json.loads(str(row.raw)) for row in rows] == json.loads(ALL_DOCS)["rows"]
+    assert meta == {"total_rows": 3, "offset": 0}
+    # Rows don't hang on to the rest of the response
+    assert all(row.raw.source == str(row.raw) for row in rows)
+    assert rows[0]["id"] == "a"
+    assert rows[0]["doc"]["s"] == '],}"{'
+    assert rows[2]["doc"]["n"] == [1.5, True, None]
+    assert "doc" not in rows[1]
+
+
+@pytest.mark.parametrize("lazy", [0, 1])
+async def test_large_row(lazy):
+    # Copying the whole row for each chunk would take far too long
+    doc = {"_id": "big", "blob": "x" * 2_000_000, "n": list(range(1000))}
+    text = json.dumps({"rows": [{"id": "big", "doc": doc}, {"id": "small"}]})
+    rows = await collect(text, 16, lazy=lazy)
+
+    assert rows[0]["doc"]["blob"] == doc["blob"]
+    assert rows[0]["doc"]["n"] == doc["n"]
+    assert rows[1]["id"] == "small"